@@ -1,6 +1,34 @@
 # job_screening_ai/agents/__init__.py
-from .jd_parser import JobDescription, JobRequirement, JDParserAgent
-from .resume_parser import CandidateProfile, CandidateExperience, CandidateEducation, ResumeParserAgent
-from .matcher import MatchResult, MatcherAgent
-from .shortlister import ShortlistResult, ShortlisterAgent
-from .email_scheduler import EmailResult, EmailSchedulerAgent
\ No newline at end of file
+import importlib
+
+# Agents are resolved on first attribute access (PEP 562), so importing one
+# agent doesn't pull in every other agent's dependencies
+_EXPORTS = {
+    "JobDescription": ".jd_parser",
+    "JobRequirement": ".jd_parser",
+    "JDParserAgent": ".jd_parser",
+    "CandidateProfile": ".resume_parser",
+    "CandidateExperience": ".resume_parser",
+    "CandidateEducation": ".resume_parser",
+    "ResumeParserAgent": ".resume_parser",
+    "MatchResult": ".matcher",
+    "MatchResultBatch": ".matcher",
+    "MatcherAgent": ".matcher",
+    "ShortlistResult": ".shortlister",
+    "ShortlisterAgent": ".shortlister",
+    "EmailResult": ".email_scheduler",
+    "EmailSchedulerAgent": ".email_scheduler",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
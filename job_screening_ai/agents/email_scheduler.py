@@ -1,22 +1,46 @@
 import os
-import json
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Dict, List, Optional, Any, Union, Tuple
-from pydantic import BaseModel, Field
-from datetime import datetime, timedelta
+import queue
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Union, Tuple
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import date, datetime, timedelta
 import re
-from dotenv import load_dotenv
 
 # Import our models
 from .resume_parser import CandidateProfile
 from .jd_parser import JobDescription
 
-# Load environment variables from .env file
-load_dotenv()
+# smtplib (and ssl behind it) is only imported once an email is actually sent
+if TYPE_CHECKING:
+    import smtplib
 
-class InterviewSlot(BaseModel):
+# Abort a batch once this fraction (1/N) of its sends have failed
+BATCH_ABORT_FAILURE_RATIO = 3
+
+# Days to add to reach the next business day, indexed by date.weekday()
+_DAYS_TO_NEXT_BUSINESS_DAY = (0, 0, 0, 0, 0, 2, 1)
+
+# Morning and afternoon interview times offered on each day
+_SLOT_TIMES = (("10:00", "11:00"), ("14:00", "15:00"))
+
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Lines starting with "." must be doubled inside the SMTP DATA section
+_DOT_LINE_RE = re.compile(rb"(?m)^\.")
+
+# Placeholders in the pre-serialized batch message, swapped per candidate
+_WIRE_TO = b"to@wire.invalid"
+_WIRE_BODY = b"@@BODY@@\r\n"
+
+# RFC 5321 line limit (998 octets plus CRLF) for bodies sent as raw 7bit text
+_MAX_7BIT_LINE = 998
+
+@dataclass(slots=True, frozen=True)
+class InterviewSlot:
     """Model for an interview time slot"""
     date: str  # YYYY-MM-DD format
     start_time: str  # HH:MM format
@@ -26,13 +50,27 @@ class InterviewSlot(BaseModel):
         """Convert to readable string format"""
         return f"{self.date} from {self.start_time} to {self.end_time}"
 
-class EmailTemplate(BaseModel):
+class _BraceTemplate(string.Template):
+    """string.Template that substitutes the {key} placeholders used by our email templates"""
+    pattern = r"""
+    \{(?:
+        (?P<escaped>(?!))
+      | (?P<named>[_a-z][_a-z0-9]*)\}
+      | (?P<braced>(?!))
+      | (?P<invalid>(?!))
+    )
+    """
+
+@dataclass(slots=True, frozen=True)
+class EmailTemplate:
     """Model for email templates"""
     subject: str
     body: str
 
 class EmailResult(BaseModel):
     """Model for email sending result"""
+    model_config = ConfigDict(extra='forbid', frozen=True)
+    
     candidate_id: str
     job_id: str
     email_to: str
@@ -41,25 +79,12 @@ class EmailResult(BaseModel):
     sent_at: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        return json.loads(self.json())
+        return self.model_dump()
 
-class EmailSchedulerAgent:
-    """Agent for scheduling interviews and sending email invitations"""
-    
-    def __init__(self, 
-                 smtp_server: str = "smtp.gmail.com", 
-                 smtp_port: int = 587):
-        # Get email credentials from environment variables
-        self.email_user = os.getenv("EMAIL_USER", "")
-        self.email_password = os.getenv("EMAIL_PASSWORD", "")
-        self.smtp_server = smtp_server
-        self.smtp_port = smtp_port
-        
-        # Default templates
-        self.templates = {
-            "interview_invitation": EmailTemplate(
-                subject="Interview Invitation for {job_title} at {company}",
-                body="""
+# Default email templates
+_INTERVIEW_INVITATION_TEMPLATE = EmailTemplate(
+    subject="Interview Invitation for {job_title} at {company}",
+    body="""
                 Dear {candidate_name},
                 
                 We're pleased to inform you that your application for the {job_title} position at {company} has been shortlisted.
@@ -74,10 +99,11 @@ class EmailSchedulerAgent:
                 HR Team
                 {company}
                 """
-            ),
-            "rejection": EmailTemplate(
-                subject="Update on your application for {job_title} at {company}",
-                body="""
+)
+
+_REJECTION_TEMPLATE = EmailTemplate(
+    subject="Update on your application for {job_title} at {company}",
+    body="""
                 Dear {candidate_name},
                 
                 Thank you for your interest in the {job_title} position at {company} and for taking the time to apply.
@@ -90,105 +116,330 @@ class EmailSchedulerAgent:
                 HR Team
                 {company}
                 """
-            )
+)
+
+_DEFAULT_COMPILED_TEMPLATES = {
+    name: (_BraceTemplate(template.subject), _BraceTemplate(template.body))
+    for name, template in (
+        ("interview_invitation", _INTERVIEW_INVITATION_TEMPLATE),
+        ("rejection", _REJECTION_TEMPLATE)
+    )
+}
+
+def _session_in_sync(error: Exception) -> bool:
+    """Whether a connection is still usable after a send raised `error`; smtplib.sendmail RSETs before
+    raising these refusals, anything else may have left the exchange half-done"""
+    import smtplib
+    return isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError))
+
+class _SMTPPool:
+    """Pool of logged-in SMTP connections shared by batch worker threads"""
+    
+    def __init__(self, connect, check, size: int, messages_per_connection: int):
+        self._connect = connect
+        self._check = check
+        self._messages_per_connection = messages_per_connection
+        self._uses: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        # Every slot starts empty (None) and is connected lazily on first borrow
+        self._idle: "queue.Queue[Optional[smtplib.SMTP]]" = queue.Queue()
+        for _ in range(size):
+            self._idle.put(None)
+    
+    def borrow(self) -> "smtplib.SMTP":
+        """Take a connection from the pool, connecting or health-checking it as needed"""
+        conn = self._idle.get()
+        try:
+            if conn is None:
+                conn = self._connect()
+            else:
+                self._check(conn)
+        except Exception:
+            if conn is not None:
+                self._discard(conn)
+            self._idle.put(None)
+            raise
+        return conn
+    
+    def release(self, conn: "smtplib.SMTP", healthy: bool = True) -> None:
+        """Return a connection, recycling it when unhealthy or after too many messages"""
+        with self._lock:
+            uses = self._uses.get(id(conn), 0) + 1
+            self._uses[id(conn)] = uses
+        if healthy and uses < self._messages_per_connection:
+            self._idle.put(conn)
+        else:
+            self._discard(conn)
+            self._idle.put(None)
+    
+    def close(self) -> None:
+        """Close every idle connection in the pool"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if conn is not None:
+                self._discard(conn)
+    
+    def _discard(self, conn: "smtplib.SMTP") -> None:
+        with self._lock:
+            self._uses.pop(id(conn), None)
+        try:
+            conn.quit()
+        except Exception:
+            conn.close()
+
+class EmailSchedulerAgent:
+    """Agent for scheduling interviews and sending email invitations"""
+    
+    def __init__(self, 
+                 smtp_server: str = "smtp.gmail.com", 
+                 smtp_port: int = 587,
+                 pool_size: int = 4,
+                 messages_per_connection: int = 100):
+        # Load environment variables from .env file
+        from dotenv import load_dotenv
+        load_dotenv()
+        
+        # Get email credentials from environment variables
+        self.email_user = os.getenv("EMAIL_USER", "")
+        self.email_password = os.getenv("EMAIL_PASSWORD", "")
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        
+        # Batch sends fan out over this many connections/threads
+        self.pool_size = pool_size
+        self.messages_per_connection = messages_per_connection
+        
+        # Default templates are shared module constants; set_custom_template only touches this instance
+        self.templates = {
+            "interview_invitation": _INTERVIEW_INVITATION_TEMPLATE,
+            "rejection": _REJECTION_TEMPLATE
         }
+        
+        # Formatted interview slots keyed by (day, num_slots); identical for every candidate that day
+        self._slots_text_cache: Dict[Tuple[date, int], str] = {}
+        
+        # Compiled subject/body templates, rendered in a single pass per email
+        self._compiled = dict(_DEFAULT_COMPILED_TEMPLATES)
     
     def _validate_email(self, email: str) -> bool:
         """Validate email format"""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        return _EMAIL_RE.match(email) is not None
     
-    def _format_template(self, template: EmailTemplate, replacements: Dict[str, str]) -> EmailTemplate:
-        """Format email template with replacements"""
-        subject = template.subject
-        body = template.body
-        
-        for key, value in replacements.items():
-            subject = subject.replace(f"{{{key}}}", value)
-            body = body.replace(f"{{{key}}}", value)
-        
-        return EmailTemplate(subject=subject, body=body)
+    def _validate_emails_bulk(self, emails: List[str]) -> List[bool]:
+        """Validate many email addresses in one pass"""
+        return [match is not None for match in map(_EMAIL_RE.match, emails)]
+    
+    def _render(self, template_type: str, replacements: Dict[str, str]) -> EmailTemplate:
+        """Render a compiled email template with replacements"""
+        subject_template, body_template = self._compiled[template_type]
+        return EmailTemplate(
+            subject=subject_template.safe_substitute(replacements),
+            body=body_template.safe_substitute(replacements)
+        )
     
     def _generate_interview_slots(self, num_slots: int = 3, start_days_from_now: int = 3) -> List[InterviewSlot]:
-        """Generate interview time slots"""
-        slots = []
-        start_date = datetime.now() + timedelta(days=start_days_from_now)
+        """Generate interview time slots: morning then afternoon on consecutive business days"""
+        start_date = date.today() + timedelta(days=start_days_from_now)
         
         # Start on the next business day (skip weekends)
-        while start_date.weekday() >= 5:  # 5 = Saturday, 6 = Sunday
-            start_date += timedelta(days=1)
+        start_date += timedelta(days=_DAYS_TO_NEXT_BUSINESS_DAY[start_date.weekday()])
+        weekday = start_date.weekday()
         
-        current_date = start_date
-        
-        for _ in range(num_slots):
-            # Skip weekends
-            while current_date.weekday() >= 5:
-                current_date += timedelta(days=1)
-            
-            # Format as YYYY-MM-DD
-            date_str = current_date.strftime("%Y-%m-%d")
-            
-            # Create morning and afternoon slots
-            morning_slot = InterviewSlot(
-                date=date_str,
-                start_time="10:00",
-                end_time="11:00"
-            )
-            
-            afternoon_slot = InterviewSlot(
-                date=date_str,
-                start_time="14:00",
-                end_time="15:00"
-            )
-            
-            slots.append(morning_slot)
-            slots.append(afternoon_slot)
+        slots = []
+        date_str = ""
+        for i in range(num_slots):
+            if i % 2 == 0:
+                # Business day i // 2 after the start, stepping over weekends arithmetically
+                weeks, day = divmod(weekday + i // 2, 5)
+                slot_date = start_date + timedelta(days=weeks * 7 + day - weekday)
+                date_str = slot_date.strftime("%Y-%m-%d")
             
-            # Move to next day
-            current_date += timedelta(days=1)
+            start_time, end_time = _SLOT_TIMES[i % 2]
+            slots.append(InterviewSlot(date=date_str, start_time=start_time, end_time=end_time))
+        
+        return slots
+    
+    def _login_smtp(self, server: "smtplib.SMTP") -> None:
+        """Run EHLO, STARTTLS and login on a freshly connected server"""
+        server.ehlo()
+        server.starttls()
+        server.ehlo()
+        server.login(self.email_user, self.email_password)
+    
+    def _connect_smtp(self) -> "smtplib.SMTP":
+        """Open an SMTP connection with STARTTLS and login already done"""
+        import smtplib
+        
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        try:
+            self._login_smtp(server)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    @contextmanager
+    def _open_smtp(self):
+        """Context manager yielding a logged-in SMTP connection, closed on exit"""
+        import smtplib
+        
+        server = self._connect_smtp()
+        try:
+            yield server
+        finally:
+            try:
+                server.quit()
+            except smtplib.SMTPException:
+                server.close()
+    
+    def _ensure_smtp_alive(self, server: "smtplib.SMTP") -> None:
+        """Check a reused connection with NOOP and reconnect it in place if the server dropped it"""
+        import smtplib
+        
+        try:
+            status, _ = server.noop()
+            if status == 250:
+                return
+        except (smtplib.SMTPException, OSError):
+            # Dropped, reset or timed-out sockets all mean the same thing here: reconnect
+            pass
+        server.close()
+        server.connect(self.smtp_server, self.smtp_port)
+        self._login_smtp(server)
+    
+    def _pipelined_send(self, server: "smtplib.SMTP", from_addr: str, to_addr: str, msg_bytes: bytes) -> Tuple[bool, str]:
+        """Send one message with MAIL/RCPT/DATA pipelined in a single write (RFC 2920)"""
+        # Dot-stuff the payload and terminate it the way smtplib.SMTP.data() does
+        payload = _DOT_LINE_RE.sub(b"..", msg_bytes)
+        if not payload.endswith(b"\r\n"):
+            payload += b"\r\n"
+        
+        server.send(f"MAIL FROM:<{from_addr}>\r\nRCPT TO:<{to_addr}>\r\nDATA\r\n".encode("ascii"))
+        mail_code, mail_resp = server.getreply()
+        rcpt_code, rcpt_resp = server.getreply()
+        data_code, data_resp = server.getreply()
+        
+        if mail_code == 250 and rcpt_code in (250, 251) and data_code == 354:
+            server.send(payload + b".\r\n")
+            code, resp = server.getreply()
+            if code == 250:
+                return True, "Email sent successfully"
+            return False, f"Failed to send email: {code} {resp.decode(errors='replace')}"
+        
+        # Something was refused; finish the transaction cleanly so the connection stays usable
+        if data_code == 354:
+            server.send(b".\r\n")
+            server.getreply()
+        server.rset()
+        
+        if mail_code != 250:
+            code, resp = mail_code, mail_resp
+        elif rcpt_code not in (250, 251):
+            code, resp = rcpt_code, rcpt_resp
+        else:
+            code, resp = data_code, data_resp
+        return False, f"Failed to send email: {code} {resp.decode(errors='replace')}"
+    
+    def _wire_template(self, subject: str) -> bytes:
+        """Serialize a message once with placeholder To and body, for batch sends sharing a subject"""
+        from email.message import EmailMessage
+        from email.policy import SMTP as SMTP_POLICY
+        
+        msg = EmailMessage()
+        msg['From'] = self.email_user
+        msg['To'] = _WIRE_TO.decode("ascii")
+        msg['Subject'] = subject
+        msg.set_content(_WIRE_BODY.decode("ascii").rstrip(), cte="7bit")
+        return msg.as_bytes(policy=SMTP_POLICY)
+    
+    def _send_wire(self, server: "smtplib.SMTP", to_email: str, body: str, wire_template: bytes) -> Tuple[bool, str, bool]:
+        """Send a batch email by patching the recipient and body into a pre-serialized message;
+        returns (success, message, whether the connection is still in sync)"""
+        # Header injection guard: the address is spliced into the header block verbatim
+        if "\r" in to_email or "\n" in to_email or not self._validate_email(to_email):
+            return False, f"Invalid email address: {to_email}", True
+        
+        lines = body.encode("ascii").splitlines()
+        body_bytes = b"\r\n".join(lines) + b"\r\n"
+        msg_bytes = wire_template.replace(_WIRE_TO, to_email.encode("ascii"), 1).replace(_WIRE_BODY, body_bytes, 1)
         
-        # Take only the requested number of slots
-        return slots[:num_slots]
+        try:
+            if server.has_extn("pipelining"):
+                # Refusals come back as replies after a clean RSET; only an exception means a desync
+                return (*self._pipelined_send(server, self.email_user, to_email, msg_bytes), True)
+            server.sendmail(self.email_user, [to_email], msg_bytes)
+            return True, "Email sent successfully", True
+        except Exception as e:
+            return False, f"Failed to send email: {str(e)}", _session_in_sync(e)
     
-    def _send_email(self, to_email: str, subject: str, body: str) -> Tuple[bool, str]:
-        """Send email using SMTP"""
+    def _send_email(self, to_email: str, subject: str, body: str,
+                    server: "Optional[smtplib.SMTP]" = None) -> Tuple[bool, str, bool]:
+        """Send email using SMTP, reusing `server` when one is passed in;
+        returns (success, message, whether `server` is still in sync)"""
         if not self.email_user or not self.email_password:
-            return False, "Email credentials not configured. Set EMAIL_USER and EMAIL_PASSWORD environment variables."
+            return False, "Email credentials not configured. Set EMAIL_USER and EMAIL_PASSWORD environment variables.", True
         
         if not self._validate_email(to_email):
-            return False, f"Invalid email address: {to_email}"
+            return False, f"Invalid email address: {to_email}", True
+        
+        from email.message import EmailMessage
+        from email.policy import SMTP as SMTP_POLICY
         
         try:
-            # Create message
-            msg = MIMEMultipart()
+            # Create message (single text/plain part, no multipart wrapper)
+            msg = EmailMessage()
             msg['From'] = self.email_user
             msg['To'] = to_email
             msg['Subject'] = subject
+            msg.set_content(body)
             
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Connect to server and send
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.email_user, self.email_password)
-            server.send_message(msg)
-            server.quit()
+            if server is None:
+                # Connect to server and send
+                with self._open_smtp() as own_server:
+                    own_server.send_message(msg)
+            elif server.has_extn("pipelining"):
+                # Caller owns the connection (batch sends); save the per-command round trips
+                msg_bytes = msg.as_bytes(policy=SMTP_POLICY)
+                return (*self._pipelined_send(server, self.email_user, to_email, msg_bytes), True)
+            else:
+                server.send_message(msg)
             
-            return True, "Email sent successfully"
+            return True, "Email sent successfully", True
         except Exception as e:
-            return False, f"Failed to send email: {str(e)}"
+            return False, f"Failed to send email: {str(e)}", _session_in_sync(e)
+    
+    def _interview_slots_text(self, num_slots: int = 3) -> str:
+        """Interview slots formatted for the email body, computed once per day"""
+        key = (date.today(), num_slots)
+        slots_text = self._slots_text_cache.get(key)
+        if slots_text is None:
+            interview_slots = self._generate_interview_slots(num_slots)
+            slots_text = "\n".join([f"- {slot.to_string()}" for slot in interview_slots])
+            if len(self._slots_text_cache) >= 8:
+                self._slots_text_cache.clear()
+            self._slots_text_cache[key] = slots_text
+        return slots_text
     
     def send_interview_invitation(self, 
                                   job: JobDescription, 
                                   candidate: CandidateProfile, 
                                   num_slots: int = 3) -> EmailResult:
         """Send interview invitation email to a candidate"""
-        # Generate interview slots
-        interview_slots = self._generate_interview_slots(num_slots)
-        
-        # Format slots as text
-        slots_text = "\n".join([f"- {slot.to_string()}" for slot in interview_slots])
-        
+        slots_text = self._interview_slots_text(num_slots)
+        result, _ = self._send_interview_invitation_prepared(job, candidate, slots_text, None)
+        return result
+    
+    def _send_interview_invitation_prepared(self,
+                                            job: JobDescription,
+                                            candidate: CandidateProfile,
+                                            slots_text: str,
+                                            server: "Optional[smtplib.SMTP]",
+                                            wire_template: Optional[bytes] = None) -> Tuple[EmailResult, bool]:
+        """Send an interview invitation with pre-formatted slots, over `server` if given;
+        also returns whether `server` is still in sync for the next message"""
         # Prepare replacements for template
         replacements = {
             "candidate_name": candidate.name,
@@ -198,10 +449,14 @@ class EmailSchedulerAgent:
         }
         
         # Format template
-        template = self._format_template(self.templates["interview_invitation"], replacements)
+        template = self._render("interview_invitation", replacements)
         
-        # Send email
-        success, message = self._send_email(candidate.email, template.subject, template.body)
+        # Send email; plain 7bit bodies can reuse the batch's pre-serialized message
+        if (wire_template is not None and server is not None and template.body.isascii()
+                and max(map(len, template.body.splitlines()), default=0) <= _MAX_7BIT_LINE):
+            success, message, in_sync = self._send_wire(server, candidate.email, template.body, wire_template)
+        else:
+            success, message, in_sync = self._send_email(candidate.email, template.subject, template.body, server=server)
         
         # Create and return result
         result = EmailResult(
@@ -213,7 +468,7 @@ class EmailSchedulerAgent:
             sent_at=datetime.now().isoformat() if success else None
         )
         
-        return result
+        return result, in_sync
     
     def send_rejection_email(self, job: JobDescription, candidate: CandidateProfile) -> EmailResult:
         """Send rejection email to a candidate"""
@@ -225,10 +480,10 @@ class EmailSchedulerAgent:
         }
         
         # Format template
-        template = self._format_template(self.templates["rejection"], replacements)
+        template = self._render("rejection", replacements)
         
         # Send email
-        success, message = self._send_email(candidate.email, template.subject, template.body)
+        success, message, _ = self._send_email(candidate.email, template.subject, template.body)
         
         # Create and return result
         result = EmailResult(
@@ -246,18 +501,87 @@ class EmailSchedulerAgent:
                                         job: JobDescription, 
                                         candidates: List[CandidateProfile], 
                                         num_slots: int = 3) -> List[EmailResult]:
-        """Send interview invitations to multiple candidates"""
-        results = []
+        """Send interview invitations to multiple candidates over a pool of SMTP connections"""
+        if not candidates:
+            return []
+        
+        if not self.email_user or not self.email_password:
+            # Nothing to connect with; let the per-candidate path report the error
+            return [self.send_interview_invitation(job, candidate, num_slots) for candidate in candidates]
+        
+        # Slots are the same for every candidate in the batch
+        slots_text = self._interview_slots_text(num_slots)
         
-        for candidate in candidates:
-            result = self.send_interview_invitation(job, candidate, num_slots)
-            results.append(result)
+        # So is the subject unless it names the candidate; then the headers can be serialized once
+        subject_template, _ = self._compiled["interview_invitation"]
+        wire_template = None
+        if "candidate_name" not in subject_template.get_identifiers():
+            # Every replacement except candidate_name is shared, so render them all as the per-candidate path does
+            subject = subject_template.safe_substitute(
+                {"job_title": job.title, "company": job.company, "interview_slots": slots_text}
+            )
+            # A multi-line subject can't go in a header; leave it to the per-candidate path to report
+            if len(subject.splitlines()) <= 1:
+                wire_template = self._wire_template(subject)
+        valid_addresses = self._validate_emails_bulk([candidate.email for candidate in candidates])
+        max_failures = max(1, len(candidates) // BATCH_ABORT_FAILURE_RATIO)
+        failures = 0
+        failures_lock = threading.Lock()
+        
+        workers = max(1, min(self.pool_size, len(candidates)))
+        pool = _SMTPPool(self._connect_smtp, self._ensure_smtp_alive, workers, self.messages_per_connection)
+        
+        def send_one(index: int) -> EmailResult:
+            nonlocal failures
+            candidate = candidates[index]
+            
+            # Stop hammering a server that keeps rejecting us
+            if failures >= max_failures:
+                return self._failed_result(job, candidate, "Batch aborted after repeated send failures")
+            
+            try:
+                server = pool.borrow()
+            except Exception as e:
+                result = self._failed_result(job, candidate, f"Failed to send email: {str(e)}")
+            else:
+                healthy = False
+                try:
+                    # Refused recipients leave the session reset and reusable; an exchange that broke
+                    # off mid-way (or a pipeline out of step) is replaced
+                    result, healthy = self._send_interview_invitation_prepared(
+                        job, candidate, slots_text, server, wire_template
+                    )
+                finally:
+                    pool.release(server, healthy=healthy)
+            
+            # Invalid addresses say nothing about the server, only count delivery failures
+            if not result.success and valid_addresses[index]:
+                with failures_lock:
+                    failures += 1
+            return result
+        
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(send_one, range(len(candidates))))
+        finally:
+            pool.close()
         
         return results
     
+    def _failed_result(self, job: JobDescription, candidate: CandidateProfile, message: str) -> EmailResult:
+        """Build a failed EmailResult for a candidate that was never sent to"""
+        return EmailResult(
+            candidate_id=candidate.candidate_id,
+            job_id=job.job_id,
+            email_to=candidate.email,
+            success=False,
+            message=message
+        )
+    
     def set_custom_template(self, template_type: str, subject: str, body: str) -> None:
         """Set a custom email template"""
         self.templates[template_type] = EmailTemplate(subject=subject, body=body)
+        self._compiled[template_type] = (_BraceTemplate(subject), _BraceTemplate(body))
 
 # Example usage
 if __name__ == "__main__":
@@ -297,10 +621,7 @@ if __name__ == "__main__":
         "interview_slots": slots_text
     }
     
-    template = email_scheduler._format_template(
-        email_scheduler.templates["interview_invitation"], 
-        replacements
-    )
+    template = email_scheduler._render("interview_invitation", replacements)
     
     print("Email Subject:")
     print(template.subject)
@@ -1,9 +1,38 @@
 import os
 import json
-import requests
-from typing import Dict, List, Optional, Any
+import asyncio
+import hashlib
+import orjson
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 from pydantic import BaseModel, Field
 
+# HTTP clients are imported when an agent is created / an async batch starts
+if TYPE_CHECKING:
+    import httpx
+
+def _job_id_for(job_description_text: str) -> str:
+    """Stable job ID derived from the job description text"""
+    # The full 64-bit digest as hex; folded into 10**7 decimal IDs, two different JDs collided at a few
+    # thousand jobs and the second silently mapped onto the first one's stored row
+    return f"JD-{hashlib.blake2b(job_description_text.encode('utf-8'), digest_size=8).hexdigest()}"
+
+def _cache_key(job_description_text: str) -> str:
+    return hashlib.blake2b(job_description_text.encode("utf-8"), digest_size=16).hexdigest()
+
+# Terse JSON skeleton instead of a field-by-field description; the static prefix
+# also stays identical across calls so Ollama can reuse its cached prefill
+_PROMPT_PREFIX = (
+    "Extract the job description into this JSON schema:\n"
+    '{"title":"","company":"","location":"","job_type":"","description":"",'
+    '"responsibilities":[],"requirements":{"required_skills":[],"preferred_skills":[],'
+    '"experience":"","education":[]},"salary_range":"","posting_date":"","department":""}\n'
+    "JD:\n"
+)
+_PROMPT_SUFFIX = "\nReturn JSON only."
+
 class JobRequirement(BaseModel):
     required_skills: List[str] = Field(default_factory=list)
     preferred_skills: List[str] = Field(default_factory=list)
@@ -24,51 +53,192 @@ class JobDescription(BaseModel):
     department: str = ""
 
     def to_dict(self) -> Dict[str, Any]:
-        return json.loads(self.json())
+        return self.model_dump()
 
 class JDParserAgent:
-    def __init__(self, ollama_url: str = "http://localhost:11434"):
+    def __init__(self, ollama_url: str = "http://localhost:11434", timeout: Optional[float] = None,
+                 cache_size: int = 256):
         self.ollama_url = ollama_url
         self.api_endpoint = f"{ollama_url}/api/generate"
+        self.timeout = timeout
+        
+        # Parsed results keyed by a digest of the JD text; re-parsing the same text skips the LLM
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, JobDescription]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Keep-alive session so repeated parses reuse the connection to Ollama
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+    
+    def close(self) -> None:
+        """Close pooled connections to Ollama"""
+        self._session.close()
+    
+    def __enter__(self) -> "JDParserAgent":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def _cache_get(self, key: str) -> Optional[JobDescription]:
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is None:
+                return None
+            self._cache.move_to_end(key)
+        return cached.model_copy(deep=True)
+    
+    def _cache_put(self, key: str, job: JobDescription) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = job.model_copy(deep=True)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
         
     def _generate_prompt(self, job_description_text: str) -> str:
         """Generate a prompt for the LLM to extract structured data from a job description"""
-        return f"""
-        You are a specialized job description parser. Extract structured information from the following job description.
-        Format the output as a valid JSON object with the following fields:
-        - title: the job title
-        - company: the company name
-        - location: the job location
-        - job_type: the employment type (Full-time, Part-time, Contract, etc.)
-        - description: a summary of the job description
-        - responsibilities: an array of key job responsibilities 
-        - requirements: an object with:
-            - required_skills: an array of required technical skills
-            - preferred_skills: an array of preferred but not required skills
-            - experience: years or level of experience required
-            - education: an array of required education qualifications
-        - salary_range: the salary range if mentioned
-        - posting_date: the date the job was posted
-        - department: the department or team
-
-        JOB DESCRIPTION:
-        {job_description_text}
-        
-        IMPORTANT: Return ONLY the valid JSON object without any additional text, explanation, or markdown formatting.
-        """
+        return _PROMPT_PREFIX + job_description_text + _PROMPT_SUFFIX
     
-    def parse_job_description(self, job_description_text: str) -> JobDescription:
+    def _request_payload(self, job_description_text: str, stream: bool = False) -> Dict[str, Any]:
+        """Build the Ollama generate request for a job description"""
         prompt = self._generate_prompt(job_description_text)
-        resp = requests.post(self.api_endpoint, json={"model": "mistral", "prompt": prompt, "stream": False})
+        return {"model": "mistral", "prompt": prompt, "stream": stream}
+    
+    def parse_job_description(self, job_description_text: str, stream: bool = False) -> JobDescription:
+        key = _cache_key(job_description_text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        if stream:
+            job = self._job_from_llm_text(self._stream_response(job_description_text), job_description_text)
+        else:
+            resp = self._session.post(
+                self.api_endpoint,
+                json=self._request_payload(job_description_text),
+                timeout=self.timeout
+            )
+            if resp.status_code != 200:
+                raise RuntimeError(f"Ollama error {resp.status_code}: {resp.text}")
+            job = self._build_job_description(resp.content, job_description_text)
+        self._cache_put(key, job)
+        return job
+    
+    def parse_many(self, job_description_texts: List[str], concurrency: int = 4,
+                   stream: bool = False) -> List[JobDescription]:
+        """Parse several job descriptions in parallel threads, keeping input order"""
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            return list(executor.map(
+                lambda text: self.parse_job_description(text, stream=stream),
+                job_description_texts
+            ))
+    
+    def _stream_response(self, job_description_text: str) -> str:
+        """Stream generated tokens and stop as soon as the outer JSON object closes"""
+        parts: List[str] = []
+        depth = 0
+        in_string = False
+        escaped = False
+        
+        with self._session.post(
+            self.api_endpoint,
+            json=self._request_payload(job_description_text, stream=True),
+            timeout=self.timeout,
+            stream=True
+        ) as resp:
+            if resp.status_code != 200:
+                raise RuntimeError(f"Ollama error {resp.status_code}: {resp.text}")
+            for line in resp.iter_lines():
+                if not line:
+                    continue
+                chunk = orjson.loads(line)
+                token = chunk.get("response", "")
+                parts.append(token)
+                
+                # Track brace depth outside of string literals
+                for ch in token:
+                    if in_string:
+                        if escaped:
+                            escaped = False
+                        elif ch == "\\":
+                            escaped = True
+                        elif ch == '"':
+                            in_string = False
+                    elif ch == '"':
+                        in_string = depth > 0
+                    elif ch == "{":
+                        depth += 1
+                    elif ch == "}" and depth > 0:
+                        depth -= 1
+                        if depth == 0:
+                            # Object is complete; closing the response drops the rest of the generation
+                            return "".join(parts)
+                
+                if chunk.get("done"):
+                    break
+        return "".join(parts)
+    
+    async def parse_job_description_async(self, job_description_text: str,
+                                          client: "Optional[httpx.AsyncClient]" = None) -> JobDescription:
+        """Parse a job description without blocking the event loop"""
+        key = _cache_key(job_description_text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        if client is None:
+            async with self._async_client() as own_client:
+                return await self.parse_job_description_async(job_description_text, own_client)
+        
+        resp = await client.post("/api/generate", json=self._request_payload(job_description_text))
         if resp.status_code != 200:
             raise RuntimeError(f"Ollama error {resp.status_code}: {resp.text}")
-
-        raw = resp.json().get("response", "")
+        job = self._build_job_description(resp.content, job_description_text)
+        self._cache_put(key, job)
+        return job
+    
+    async def parse_many_async(self, job_description_texts: List[str], concurrency: int = 4) -> List[JobDescription]:
+        """Parse several job descriptions concurrently, at most `concurrency` in flight at once"""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async with self._async_client() as client:
+            async def parse_one(text: str) -> JobDescription:
+                async with semaphore:
+                    return await self.parse_job_description_async(text, client)
+            
+            return await asyncio.gather(*[parse_one(text) for text in job_description_texts])
+    
+    def _async_client(self) -> "httpx.AsyncClient":
+        import httpx
+        
+        # Scoped per batch: an AsyncClient's pool is tied to the event loop that created it
+        return httpx.AsyncClient(base_url=self.ollama_url, timeout=self.timeout)
+    
+    def _build_job_description(self, response_body: bytes, job_description_text: str) -> JobDescription:
+        """Turn a raw Ollama generate response into a JobDescription"""
+        raw = orjson.loads(response_body).get("response", "")
+        return self._job_from_llm_text(raw, job_description_text)
+    
+    def _job_from_llm_text(self, raw: str, job_description_text: str) -> JobDescription:
+        """Build a JobDescription from the model's generated text"""
         clean = self._clean_json_response(raw)
         try:
-            data = json.loads(clean)
-        except json.JSONDecodeError:
-            raise ValueError(f"Invalid JSON from LLM: {clean}")
+            data = orjson.loads(clean)
+        except orjson.JSONDecodeError:
+            # Stray code fences inside the braces; retry with the fences stripped out
+            clean = self._clean_json_response(self._strip_code_fences(raw))
+            try:
+                data = orjson.loads(clean)
+            except orjson.JSONDecodeError:
+                raise ValueError(f"Invalid JSON from LLM: {clean}")
 
         req = data.get("requirements", {})
         requirements = JobRequirement(
@@ -79,7 +249,7 @@ class JDParserAgent:
         )
 
         return JobDescription(
-            job_id=f"JD-{abs(hash(job_description_text)) % 10000}",
+            job_id=_job_id_for(job_description_text),
             title=data.get("title", ""),
             company=data.get("company", ""),
             location=data.get("location", ""),
@@ -93,10 +263,13 @@ class JDParserAgent:
         )
 
     def _clean_json_response(self, text: str) -> str:
-        cleaned = text.replace("```json", "").replace("```", "").strip()
-        start = cleaned.find("{")
-        end = cleaned.rfind("}") + 1
-        return cleaned[start:end] if start >= 0 and end > start else cleaned
+        # The outermost braces already exclude any ```json fences around the object
+        start = text.find("{")
+        end = text.rfind("}") + 1
+        return text[start:end] if 0 <= start < end else text.strip()
+
+    def _strip_code_fences(self, text: str) -> str:
+        return text.replace("```json", "").replace("```", "").strip()
 
 # Example usage
 if __name__ == "__main__":
@@ -137,6 +310,6 @@ if __name__ == "__main__":
     Posting Date: 2023-09-15
     """
     
-    parser = JDParserAgent()
-    parsed_jd = parser.parse_job_description(sample_jd)
+    with JDParserAgent() as parser:
+        parsed_jd = parser.parse_job_description(sample_jd)
     print(json.dumps(parsed_jd.to_dict(), indent=2))
\ No newline at end of file
@@ -1,28 +1,136 @@
 import json
+import asyncio
+import logging
 import requests
+from datetime import date
+from requests.adapters import HTTPAdapter
+from functools import lru_cache
 from typing import Dict, List, Optional, Any, Tuple
 from pydantic import BaseModel, Field
 import nltk
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 from nltk.stem import WordNetLemmatizer
-import string
 import numpy as np
 import os
+import re
+import importlib.util
+from dataclasses import dataclass
 
 # Import our models
 from .jd_parser import JobDescription, JobRequirement
-from .resume_parser import CandidateProfile
+from .resume_parser import CandidateProfile, CandidateExperience, CandidateEducation
 
-# Download NLTK resources (if not already downloaded)
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('stopwords')
-    nltk.download('wordnet')
+logger = logging.getLogger(__name__)
+
+def _ensure_nltk_data(*resources: Tuple[str, str]) -> None:
+    """Download any NLTK resources that aren't installed yet"""
+    for resource_path, resource_name in resources:
+        try:
+            nltk.data.find(resource_path)
+        except LookupError:
+            nltk.download(resource_name)
+
+# Download NLTK resources (if not already downloaded); WordNet only when a matcher asks for it
+_ensure_nltk_data(('corpora/stopwords', 'stopwords'))
+
+# Skill tokens: words plus the symbols that matter in tech names (c++, c#, .net, node.js);
+# a trailing period is sentence punctuation, not part of the token
+_TOKEN_RE = re.compile(r"\.?[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+
+_YEARS_RE = re.compile(r'(\d+)[\+]?\s*(?:years?|yrs?)', re.IGNORECASE)
+_YEAR4_RE = re.compile(r'(\d{4})')
+_SCORE_RE = re.compile(r'(\d+\.?\d*)')
+
+# Optional semantic skill matching (requires sentence-transformers)
+_EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_MATCH_THRESHOLD = 0.7
+
+# Heuristic scores this consistent are taken as final without asking the LLM
+LLM_GATE_MAX_SPREAD = 10.0
+LLM_GATE_MIN_EDUCATION = 80.0
+
+# Batches at least this large compute their heuristic scores off the event loop thread
+HEURISTIC_THREAD_MIN_BATCH = 32
+
+# Education level hierarchy, matched in a single regex pass per string
+_EDU_MAP = {
+    "high school": 1,
+    "associate": 2,
+    "bachelor": 3,
+    "master": 4,
+    "phd": 5,
+    "doctorate": 5
+}
+_EDU_RE = re.compile("|".join(_EDU_MAP), re.IGNORECASE)
+
+_MAX_EDU_LEVEL = max(_EDU_MAP.values())
+
+def _education_level(text: str) -> int:
+    """Highest education level mentioned in the text, 0 if none"""
+    return max((_EDU_MAP[found.lower()] for found in _EDU_RE.findall(text)), default=0)
+
+def _highest_education_level(texts) -> int:
+    """Highest education level across texts, stopping early once the top level is seen"""
+    highest = 0
+    for text in texts:
+        highest = max(highest, _education_level(text))
+        if highest >= _MAX_EDU_LEVEL:
+            break
+    return highest
+
+@lru_cache(maxsize=None)
+def _stop_words() -> frozenset:
+    """Shared English stopword set, loaded once on first use"""
+    return frozenset(stopwords.words('english'))
+
+@lru_cache(maxsize=None)
+def _wordnet_lemmatizer() -> WordNetLemmatizer:
+    """Shared WordNet lemmatizer; the corpus is only downloaded/loaded if requested"""
+    _ensure_nltk_data(('corpora/wordnet', 'wordnet'), ('corpora/omw-1.4', 'omw-1.4'))
+    return WordNetLemmatizer()
+
+def _light_norm(token: str) -> str:
+    """Strip a plural 's' from plain words (apis -> api); skill names rarely need more"""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss") and token.isalpha():
+        return token[:-1]
+    return token
+
+@lru_cache(maxsize=4096)
+def _preprocess_text(text: str, use_wordnet: bool = False) -> Tuple[str, ...]:
+    """Preprocess text by tokenizing, removing stopwords, and normalizing plurals"""
+    stop_words = _stop_words()
+    # Lowercase and tokenize; the regex already leaves punctuation out
+    tokens = [token for token in _TOKEN_RE.findall(text.lower()) if token not in stop_words]
+    if use_wordnet:
+        lemmatizer = _wordnet_lemmatizer()
+        return tuple(lemmatizer.lemmatize(token) for token in tokens)
+    return tuple(_light_norm(token) for token in tokens)
+
+# Sized to hold a full candidate pool so MatcherAgent.warm() isn't evicted by itself
+_SKILL_SETS_CACHE_SIZE = 16384
+
+@lru_cache(maxsize=_SKILL_SETS_CACHE_SIZE)
+def _skill_sets(skills: Tuple[str, ...], use_wordnet: bool = False) -> Tuple[frozenset, ...]:
+    """Token sets for a list of skills, deduplicated and cached per skill list"""
+    return tuple(dict.fromkeys(frozenset(_preprocess_text(skill, use_wordnet)) for skill in skills))
+
+@lru_cache(maxsize=256)
+def _job_skill_sets(skills: Tuple[str, ...], use_wordnet: bool = False) -> Tuple[frozenset, ...]:
+    """Token set per job skill, aligned with `skills` and cached per job skill list"""
+    return tuple(frozenset(_preprocess_text(skill, use_wordnet)) for skill in skills)
+
+@lru_cache(maxsize=None)
+def _embedding_model():
+    """Sentence embedding model, imported and loaded on first use"""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(_EMBEDDING_MODEL_NAME)
+
+@lru_cache(maxsize=1024)
+def _embed_skills(skills: Tuple[str, ...]) -> np.ndarray:
+    """Unit-length embeddings for a list of skills, one row per skill, cached per skill list"""
+    embeddings = _embedding_model().encode(list(skills), normalize_embeddings=True, convert_to_numpy=True)
+    embeddings.setflags(write=False)  # Shared through the cache
+    return embeddings
 
 class MatchResult(BaseModel):
     """Model for the result of a candidate-job matching process"""
@@ -35,93 +143,216 @@ class MatchResult(BaseModel):
     match_details: Dict[str, Any] = Field(default_factory=dict)
     
     def to_dict(self) -> Dict[str, Any]:
-        return json.loads(self.json())
+        return self.model_dump()
+
+@dataclass(slots=True)
+class MatchResultBatch:
+    """Match results for one job stored column-wise (one array per score) for vectorized shortlisting"""
+    job_id: str
+    candidate_ids: np.ndarray  # object array of candidate IDs
+    overall_scores: np.ndarray  # float64, like the scores on MatchResult
+    skill_scores: np.ndarray
+    experience_scores: np.ndarray
+    education_scores: np.ndarray
+    match_details: List[Dict[str, Any]]
+    
+    def __len__(self) -> int:
+        return len(self.candidate_ids)
+    
+    @classmethod
+    def from_rows(cls, job_id: str, rows: List[Dict[str, Any]]) -> "MatchResultBatch":
+        """Build a batch from match dicts (MatchResult.to_dict() output or database rows)"""
+        n = len(rows)
+        candidate_ids = np.empty(n, dtype=object)
+        scores = np.empty((4, n), dtype=np.float64)
+        for i, row in enumerate(rows):
+            candidate_ids[i] = row["candidate_id"]
+            scores[0, i] = row.get("overall_match_score", 0)
+            scores[1, i] = row.get("skill_match_score", 0)
+            scores[2, i] = row.get("experience_match_score", 0)
+            scores[3, i] = row.get("education_match_score", 0)
+        return cls(
+            job_id=job_id,
+            candidate_ids=candidate_ids,
+            overall_scores=scores[0],
+            skill_scores=scores[1],
+            experience_scores=scores[2],
+            education_scores=scores[3],
+            match_details=[row.get("match_details") or {} for row in rows]
+        )
+    
+    @classmethod
+    def from_match_results(cls, match_results: List[MatchResult]) -> "MatchResultBatch":
+        """Build a batch from MatchResult objects"""
+        n = len(match_results)
+        candidate_ids = np.empty(n, dtype=object)
+        candidate_ids[:] = [result.candidate_id for result in match_results]
+        return cls(
+            job_id=match_results[0].job_id if match_results else "unknown",
+            candidate_ids=candidate_ids,
+            overall_scores=np.fromiter((r.overall_match_score for r in match_results), dtype=np.float64, count=n),
+            skill_scores=np.fromiter((r.skill_match_score for r in match_results), dtype=np.float64, count=n),
+            experience_scores=np.fromiter((r.experience_match_score for r in match_results), dtype=np.float64, count=n),
+            education_scores=np.fromiter((r.education_match_score for r in match_results), dtype=np.float64, count=n),
+            match_details=[result.match_details for result in match_results]
+        )
+    
+    def to_match_results(self) -> List[MatchResult]:
+        """Per-candidate MatchResult objects, for callers that need the row-wise models"""
+        return [
+            MatchResult(
+                job_id=self.job_id,
+                candidate_id=candidate_id,
+                overall_match_score=overall,
+                skill_match_score=skill,
+                experience_match_score=experience,
+                education_match_score=education,
+                match_details=details
+            )
+            for candidate_id, overall, skill, experience, education, details in zip(
+                self.candidate_ids.tolist(), self.overall_scores.tolist(), self.skill_scores.tolist(),
+                self.experience_scores.tolist(), self.education_scores.tolist(), self.match_details
+            )
+        ]
 
 class MatcherAgent:
     """Agent for matching candidates to job descriptions"""
     
-    def __init__(self, ollama_url: str = "http://localhost:11434"):
+    def __init__(self, ollama_url: str = "http://localhost:11434", use_wordnet: bool = False,
+                 llm_concurrency: int = 8, timeout: Optional[float] = None, use_embeddings: bool = False):
         self.ollama_url = ollama_url
         self.api_endpoint = f"{ollama_url}/api/generate"
-        self.lemmatizer = WordNetLemmatizer()
-        self.stop_words = set(stopwords.words('english'))
-    
-    def _preprocess_text(self, text: str) -> List[str]:
-        """Preprocess text by tokenizing, removing stopwords, and lemmatizing"""
-        # Convert to lowercase
-        text = text.lower()
-        # Tokenize
-        tokens = word_tokenize(text)
-        # Remove punctuation and stopwords
-        tokens = [self.lemmatizer.lemmatize(token) for token in tokens 
-                  if token not in string.punctuation and token not in self.stop_words]
-        return tokens
-    
-    def _calculate_skill_match(self, job_skills: List[str], candidate_skills: List[str]) -> Tuple[float, List[str]]:
+        self.timeout = timeout
+        # Upper bound on concurrent final-evaluation requests sent to Ollama
+        self.llm_concurrency = llm_concurrency
+        # WordNet lemmatization rarely changes skill matches; off by default in favour of _light_norm
+        self.use_wordnet = use_wordnet
+        
+        # Semantic skill matching with sentence embeddings instead of token overlap
+        if use_embeddings and importlib.util.find_spec("sentence_transformers") is None:
+            raise ImportError("use_embeddings=True requires the sentence-transformers package")
+        self.use_embeddings = use_embeddings
+        
+        # Keep-alive session so per-candidate evaluations reuse the connection to Ollama
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+    
+    def close(self) -> None:
+        """Close pooled connections to Ollama"""
+        self._session.close()
+    
+    def __enter__(self) -> "MatcherAgent":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def _preprocess_text(self, text: str) -> Tuple[str, ...]:
+        """Preprocess text by tokenizing, removing stopwords, and normalizing (cached per string)"""
+        return _preprocess_text(text, self.use_wordnet)
+    
+    def _preprocess_candidate(self, candidate: CandidateProfile) -> Tuple[frozenset, ...]:
+        """Token sets for a candidate's skills, cached so they are reused across job descriptions"""
+        return _skill_sets(tuple(candidate.skills), self.use_wordnet)
+    
+    def _preprocess_job(self, job_skills: List[str]) -> Tuple[frozenset, ...]:
+        """Token sets for a job's skills, computed once per job and reused for every candidate"""
+        return _job_skill_sets(tuple(job_skills), self.use_wordnet)
+    
+    def warm(self, candidates: List[CandidateProfile], jobs: Optional[List[JobDescription]] = None) -> None:
+        """Precompute the cached skill token sets (and embeddings, if enabled) ahead of matching"""
+        for candidate in candidates[:_SKILL_SETS_CACHE_SIZE]:
+            self._preprocess_candidate(candidate)
+        for job in jobs or []:
+            job_skills = job.requirements.required_skills + job.requirements.preferred_skills
+            self._preprocess_job(job_skills)
+            if self.use_embeddings and job_skills:
+                _embed_skills(tuple(job_skills))
+        
+        if self.use_embeddings:
+            # Only as many as the embedding cache holds; warming more would evict the first ones
+            limit = _embed_skills.cache_info().maxsize
+            for candidate in candidates[:limit]:
+                if candidate.skills:
+                    _embed_skills(tuple(candidate.skills))
+    
+    def _calculate_skill_match(self, job_skills: List[str], candidate_skills: List[str],
+                               candidate_sets: Optional[Tuple[frozenset, ...]] = None,
+                               job_sets: Optional[Tuple[frozenset, ...]] = None) -> Tuple[float, List[str]]:
         """Calculate skill match score and identify matched skills"""
         if not job_skills:
             return 100.0, []  # If no skills specified in job, consider it a full match
         
-        # Preprocess all skills
-        preprocessed_job_skills = [self._preprocess_text(skill) for skill in job_skills]
-        preprocessed_candidate_skills = [self._preprocess_text(skill) for skill in candidate_skills]
+        if self.use_embeddings:
+            return self._embedding_skill_match(job_skills, candidate_skills)
         
-        # Flatten the lists of tokens
-        job_skill_tokens = [token for tokens in preprocessed_job_skills for token in tokens]
-        candidate_skill_tokens = [token for tokens in preprocessed_candidate_skills for token in tokens]
+        if candidate_sets is None:
+            candidate_sets = _skill_sets(tuple(candidate_skills), self.use_wordnet)
+        if not candidate_sets:
+            return 0.0, []  # Nothing on the candidate side can match
+        if job_sets is None:
+            job_sets = self._preprocess_job(job_skills)
         
-        # Count matches
+        # Preprocessed skill sets come from the caches above; count matches
         matched_skills = []
-        for job_skill in job_skills:
-            job_skill_tokens = self._preprocess_text(job_skill)
-            
-            # Consider it a match if any of the candidate's skills contain all tokens of the job skill
-            for candidate_skill in candidate_skills:
-                candidate_skill_tokens = self._preprocess_text(candidate_skill)
-                
-                # If all job skill tokens are in the candidate skill tokens, or vice versa
-                if all(token in candidate_skill_tokens for token in job_skill_tokens) or \
-                   all(token in job_skill_tokens for token in candidate_skill_tokens):
-                    matched_skills.append(job_skill)
-                    break
+        for job_skill, job_set in zip(job_skills, job_sets):
+            # A match if a candidate skill contains all tokens of the job skill, or vice versa
+            if any(job_set <= candidate_set or candidate_set <= job_set for candidate_set in candidate_sets):
+                matched_skills.append(job_skill)
         
         # Calculate score
         match_score = (len(matched_skills) / len(job_skills)) * 100 if job_skills else 100.0
         return match_score, matched_skills
     
-    def _calculate_experience_match(self, required_experience: str, candidate_experiences: List[Dict[str, str]]) -> float:
+    def _embedding_skill_match(self, job_skills: List[str], candidate_skills: List[str]) -> Tuple[float, List[str]]:
+        """Skill match by cosine similarity of skill embeddings"""
+        if not candidate_skills:
+            return 0.0, []
+        
+        job_embeddings = _embed_skills(tuple(job_skills))
+        candidate_embeddings = _embed_skills(tuple(candidate_skills))
+        
+        # Embeddings are unit length, so one matmul gives every candidate/job cosine similarity
+        similarity = candidate_embeddings @ job_embeddings.T
+        is_matched = similarity.max(axis=0) > EMBEDDING_MATCH_THRESHOLD
+        
+        matched_skills = [skill for skill, matched in zip(job_skills, is_matched) if matched]
+        return (len(matched_skills) / len(job_skills)) * 100, matched_skills
+    
+    def _calculate_experience_match(self, required_experience: str, candidate_experiences: List[CandidateExperience]) -> float:
         """Calculate experience match score based on years of experience"""
         if not required_experience:
             return 100.0  # If no experience requirement, consider it a full match
         
         # Extract years from required experience string
-        import re
-        years_pattern = r'(\d+)[\+]?\s*(?:years?|yrs?)'
-        required_years_match = re.search(years_pattern, required_experience.lower())
+        required_years_match = _YEARS_RE.search(required_experience)
         if not required_years_match:
             return 80.0  # If we can't parse the required years, give a default score
         
         required_years = int(required_years_match.group(1))
         
         # Calculate total years from candidate experiences
+        current_year = date.today().year
         total_candidate_years = 0
         for exp in candidate_experiences:
-            duration = exp.get("duration", "")
-            years_match = re.search(years_pattern, duration.lower())
+            duration = exp.duration
+            years_match = _YEARS_RE.search(duration)
             if years_match:
                 total_candidate_years += int(years_match.group(1))
             else:
                 # Try to calculate from start and end dates
-                start = exp.get("start_date", "")
-                end = exp.get("end_date", "").lower()
+                start = exp.start_date
+                end = exp.end_date.lower()
                 
                 # Extract years from dates
-                start_year_match = re.search(r'(\d{4})', start)
-                end_year_match = re.search(r'(\d{4})', end) if "present" not in end else None
+                start_year_match = _YEAR4_RE.search(start)
+                end_year_match = _YEAR4_RE.search(end) if "present" not in end else None
                 
                 if start_year_match:
                     start_year = int(start_year_match.group(1))
-                    end_year = int(end_year_match.group(1)) if end_year_match else 2023  # Use current year if "present"
+                    end_year = int(end_year_match.group(1)) if end_year_match else current_year  # Use current year if "present"
                     total_candidate_years += (end_year - start_year)
         
         # Calculate score
@@ -136,40 +367,20 @@ class MatcherAgent:
         else:
             return 30.0
     
-    def _calculate_education_match(self, required_education: List[str], candidate_education: List[Dict[str, str]]) -> float:
+    def _calculate_education_match(self, required_education: List[str], candidate_education: List[CandidateEducation]) -> float:
         """Calculate education match score"""
         if not required_education:
             return 100.0  # If no education requirement, consider it a full match
         
-        # Education level hierarchy
-        education_levels = {
-            "high school": 1,
-            "associate": 2,
-            "bachelor": 3,
-            "master": 4,
-            "phd": 5,
-            "doctorate": 5
-        }
-        
         # Extract required education level
-        required_level = 0
-        for edu in required_education:
-            edu_lower = edu.lower()
-            for level, value in education_levels.items():
-                if level in edu_lower:
-                    required_level = max(required_level, value)
+        required_level = _highest_education_level(required_education)
         
         # If no specific level found, default to bachelor's
         if required_level == 0:
             required_level = 3
         
         # Extract candidate's highest education level
-        candidate_level = 0
-        for edu in candidate_education:
-            degree = edu.get("degree", "").lower()
-            for level, value in education_levels.items():
-                if level in degree:
-                    candidate_level = max(candidate_level, value)
+        candidate_level = _highest_education_level(edu.degree for edu in candidate_education)
         
         # Calculate score
         if candidate_level >= required_level:
@@ -181,10 +392,10 @@ class MatcherAgent:
         else:
             return 40.0
     
-    def _use_llm_for_final_evaluation(self, job: JobDescription, candidate: CandidateProfile, 
-                                      skill_score: float, experience_score: float, education_score: float) -> float:
-        """Use LLM to make a final evaluation and adjustment to the match score"""
-        prompt = f"""
+    def _evaluation_prompt(self, job: JobDescription, candidate: CandidateProfile,
+                           skill_score: float, experience_score: float, education_score: float) -> str:
+        """Build the final-evaluation prompt for one candidate"""
+        return f"""
         You are an expert HR professional evaluating a candidate for a job position.
         Please analyze the match between the candidate and job description, and provide a final match score (0-100).
         
@@ -210,70 +421,111 @@ class MatcherAgent:
         Based on your expert analysis, provide a single overall match score as a percentage (0-100).
         Just return the number without any explanation or additional text.
         """
+    
+    def _score_from_llm_response(self, generated_text: str) -> Optional[float]:
+        """Pull the score out of the LLM's reply, clamped to 0-100"""
+        match = _SCORE_RE.search(generated_text)
+        if match:
+            score = float(match.group(1))
+            # Ensure the score is within valid range
+            return max(0.0, min(100.0, score))
+        return None
+    
+    def _use_llm_for_final_evaluation(self, job: JobDescription, candidate: CandidateProfile, 
+                                      skill_score: float, experience_score: float, education_score: float) -> Optional[float]:
+        """Use LLM to make a final evaluation and adjustment to the match score, None if it gave no score"""
+        prompt = self._evaluation_prompt(job, candidate, skill_score, experience_score, education_score)
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.api_endpoint,
                 json={
                     "model": "mistral",
                     "prompt": prompt,
                     "stream": False
-                }
+                },
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
                 # Extract the generated text from Ollama response
-                generated_text = response.json().get("response", "").strip()
-                
-                # Try to extract just the number
-                import re
-                match = re.search(r'(\d+\.?\d*)', generated_text)
-                if match:
-                    score = float(match.group(1))
-                    # Ensure the score is within valid range
-                    return max(0.0, min(100.0, score))
-            
-            # If anything goes wrong, fallback to weighted average
-            return self._calculate_weighted_average(skill_score, experience_score, education_score)
+                return self._score_from_llm_response(response.json().get("response", ""))
+            return None
                 
         except Exception as e:
-            print(f"Error using LLM for final evaluation: {str(e)}")
-            # Fallback to weighted average
-            return self._calculate_weighted_average(skill_score, experience_score, education_score)
+            logger.warning("Error using LLM for final evaluation: %s", e)
+            return None
+    
+    async def _use_llm_batch(self, job: JobDescription, candidates: List[CandidateProfile],
+                             scores: List[Tuple[float, float, float]]) -> List[Optional[float]]:
+        """Final LLM evaluation for many candidates concurrently, at most `llm_concurrency` in flight;
+        None for each candidate the LLM couldn't score"""
+        import httpx
+        
+        semaphore = asyncio.Semaphore(max(1, self.llm_concurrency))
+        
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async def evaluate(candidate: CandidateProfile, candidate_scores: Tuple[float, float, float]) -> Optional[float]:
+                prompt = self._evaluation_prompt(job, candidate, *candidate_scores)
+                async with semaphore:
+                    response = await client.post(
+                        self.api_endpoint,
+                        json={"model": "mistral", "prompt": prompt, "stream": False}
+                    )
+                if response.status_code != 200:
+                    return None
+                return self._score_from_llm_response(response.json().get("response", ""))
+            
+            replies = await asyncio.gather(
+                *[evaluate(candidate, candidate_scores) for candidate, candidate_scores in zip(candidates, scores)],
+                return_exceptions=True
+            )
+        
+        final_scores = []
+        for reply in replies:
+            if isinstance(reply, Exception):
+                logger.warning("Error using LLM for final evaluation: %s", reply)
+                reply = None
+            final_scores.append(reply)
+        return final_scores
     
     def _calculate_weighted_average(self, skill_score: float, experience_score: float, education_score: float) -> float:
         """Calculate weighted average of the scores"""
         # Weights: Skills (50%), Experience (30%), Education (20%)
         return (skill_score * 0.5) + (experience_score * 0.3) + (education_score * 0.2)
     
-    def match_candidate_to_job(self, job: JobDescription, candidate: CandidateProfile) -> MatchResult:
-        """Match a candidate profile to a job description and return a score"""
+    def _heuristic_scores(self, job: JobDescription, candidate: CandidateProfile) -> Tuple[float, float, float, List[str]]:
+        """Skill, experience and education scores plus the matched skills"""
         # Calculate skill match
         required_skills = job.requirements.required_skills
         preferred_skills = job.requirements.preferred_skills
         all_job_skills = required_skills + preferred_skills
         candidate_skills = candidate.skills
         
-        skill_score, matched_skills = self._calculate_skill_match(all_job_skills, candidate_skills)
+        skill_score, matched_skills = self._calculate_skill_match(
+            all_job_skills, candidate_skills, self._preprocess_candidate(candidate), self._preprocess_job(all_job_skills)
+        )
         
         # Calculate experience match
         required_experience = job.requirements.experience
-        candidate_experiences = [exp.dict() for exp in candidate.experience]
-        experience_score = self._calculate_experience_match(required_experience, candidate_experiences)
+        experience_score = self._calculate_experience_match(required_experience, candidate.experience)
         
         # Calculate education match
         required_education = job.requirements.education
-        candidate_education = [edu.dict() for edu in candidate.education]
-        education_score = self._calculate_education_match(required_education, candidate_education)
-        
-        # Calculate overall match score
-        # Option 1: Simple weighted average
-        # overall_score = self._calculate_weighted_average(skill_score, experience_score, education_score)
+        education_score = self._calculate_education_match(required_education, candidate.education)
         
-        # Option 2: Use LLM for final evaluation
-        overall_score = self._use_llm_for_final_evaluation(
-            job, candidate, skill_score, experience_score, education_score
-        )
+        return skill_score, experience_score, education_score, matched_skills
+    
+    def _heuristic_scores_many(self, job: JobDescription,
+                               candidates: List[CandidateProfile]) -> List[Tuple[float, float, float, List[str]]]:
+        """_heuristic_scores for each candidate"""
+        return [self._heuristic_scores(job, candidate) for candidate in candidates]
+    
+    def _build_match_result(self, job: JobDescription, candidate: CandidateProfile, overall_score: float,
+                            skill_score: float, experience_score: float, education_score: float,
+                            matched_skills: List[str], evaluation: str = "llm") -> MatchResult:
+        """Assemble the MatchResult for a scored candidate"""
+        all_job_skills = job.requirements.required_skills + job.requirements.preferred_skills
         
         # Create match details
         match_details = {
@@ -281,7 +533,10 @@ class MatcherAgent:
             "missing_skills": [skill for skill in all_job_skills if skill not in matched_skills],
             "skill_match_percentage": skill_score,
             "experience_match_percentage": experience_score,
-            "education_match_percentage": education_score
+            "education_match_percentage": education_score,
+            # Which path produced overall_match_score: "llm", "heuristic", or "fallback" (weighted
+            # average because the LLM was asked but gave no score)
+            "evaluation": evaluation
         }
         
         # Create and return MatchResult
@@ -296,6 +551,76 @@ class MatcherAgent:
         )
         
         return result
+    
+    def _needs_llm_evaluation(self, skill_score: float, experience_score: float, education_score: float) -> bool:
+        """Only ask the LLM when the heuristic scores disagree or education is weak"""
+        return not (abs(skill_score - experience_score) < LLM_GATE_MAX_SPREAD
+                    and education_score > LLM_GATE_MIN_EDUCATION)
+    
+    def match_candidate_to_job(self, job: JobDescription, candidate: CandidateProfile) -> MatchResult:
+        """Match a candidate profile to a job description and return a score"""
+        skill_score, experience_score, education_score, matched_skills = self._heuristic_scores(job, candidate)
+        
+        # Calculate overall match score
+        if self._needs_llm_evaluation(skill_score, experience_score, education_score):
+            # Use LLM for final evaluation
+            overall_score = self._use_llm_for_final_evaluation(
+                job, candidate, skill_score, experience_score, education_score
+            )
+            evaluation = "llm"
+            if overall_score is None:
+                overall_score = self._calculate_weighted_average(skill_score, experience_score, education_score)
+                evaluation = "fallback"
+        else:
+            # Consistent heuristics: simple weighted average
+            overall_score = self._calculate_weighted_average(skill_score, experience_score, education_score)
+            evaluation = "heuristic"
+        
+        return self._build_match_result(
+            job, candidate, overall_score, skill_score, experience_score, education_score, matched_skills, evaluation
+        )
+    
+    async def amatch_candidates_to_job(self, job: JobDescription, candidates: List[CandidateProfile]) -> List[MatchResult]:
+        """Match many candidates to a job, running the LLM evaluations concurrently"""
+        if len(candidates) >= HEURISTIC_THREAD_MIN_BATCH:
+            # Large batches would hold up every other request on the loop while they're scored
+            heuristics = await asyncio.to_thread(self._heuristic_scores_many, job, candidates)
+        else:
+            heuristics = self._heuristic_scores_many(job, candidates)
+        
+        # Weighted average for consistent heuristics, LLM only for the rest
+        overall_scores = [self._calculate_weighted_average(*h[:3]) for h in heuristics]
+        evaluations = ["heuristic"] * len(candidates)
+        llm_indexes = [i for i, h in enumerate(heuristics) if self._needs_llm_evaluation(*h[:3])]
+        if llm_indexes:
+            llm_scores = await self._use_llm_batch(
+                job, [candidates[i] for i in llm_indexes], [heuristics[i][:3] for i in llm_indexes]
+            )
+            for i, score in zip(llm_indexes, llm_scores):
+                # Candidates the LLM couldn't score keep the weighted average
+                if score is None:
+                    evaluations[i] = "fallback"
+                else:
+                    overall_scores[i] = score
+                    evaluations[i] = "llm"
+        
+        return [
+            self._build_match_result(job, candidate, overall_score, *h, evaluation)
+            for candidate, overall_score, h, evaluation in zip(candidates, overall_scores, heuristics, evaluations)
+        ]
+    
+    def match_candidates_to_job(self, job: JobDescription, candidates: List[CandidateProfile]) -> List[MatchResult]:
+        """Blocking wrapper around amatch_candidates_to_job for synchronous callers"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.amatch_candidates_to_job(job, candidates))
+        # asyncio.run can't nest inside a running loop (notebooks, async handlers), so score one by one
+        return [self.match_candidate_to_job(job, candidate) for candidate in candidates]
+    
+    def match_candidates_to_job_batch(self, job: JobDescription, candidates: List[CandidateProfile]) -> MatchResultBatch:
+        """Like match_candidates_to_job, but returns the results column-wise for the shortlister"""
+        return MatchResultBatch.from_match_results(self.match_candidates_to_job(job, candidates))
 
 # Example usage
 if __name__ == "__main__":
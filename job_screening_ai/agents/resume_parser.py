@@ -1,11 +1,19 @@
 import os
 import json
+import hashlib
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 import fitz  # PyMuPDF
 from typing import Dict, List, Optional, Any
 from pydantic import BaseModel, Field, EmailStr
 import re
 
+def _candidate_id_for(resume_text: str) -> str:
+    """Stable candidate ID derived from the resume text"""
+    # 40 bits as hex; folding into a small decimal range made collisions likely at a few thousand resumes
+    return f"C-{hashlib.blake2b(resume_text.encode('utf-8', 'ignore'), digest_size=5).hexdigest()}"
+
 class CandidateExperience(BaseModel):
     """Model for candidate work experience"""
     company: str = ""
@@ -38,23 +46,41 @@ class CandidateProfile(BaseModel):
     languages: List[str] = Field(default_factory=list)
     
     def to_dict(self) -> Dict[str, Any]:
-        return json.loads(self.json())
+        return self.model_dump()
 
 class ResumeParserAgent:
     """Agent for parsing resumes using Ollama LLM"""
     
-    def __init__(self, ollama_url: str = "http://localhost:11434"):
+    def __init__(self, ollama_url: str = "http://localhost:11434", timeout: Optional[float] = None,
+                 cache_dir: Optional[str] = os.path.join(".cache", "resumes")):
         self.ollama_url = ollama_url
         self.api_endpoint = f"{ollama_url}/api/generate"
+        self.timeout = timeout
+        
+        # Parsed profiles keyed by a digest of the resume file; None disables the disk cache
+        self.cache_dir = cache_dir
+        
+        # Keep-alive session so repeated parses reuse the connection to Ollama
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+    
+    def close(self) -> None:
+        """Close pooled connections to Ollama"""
+        self._session.close()
+    
+    def __enter__(self) -> "ResumeParserAgent":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
     
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text content from a PDF file"""
         try:
-            document = fitz.open(pdf_path)
-            text = ""
-            for page in document:
-                text += page.get_text()
-            return text
+            with fitz.open(pdf_path) as document:
+                return "\n".join(page.get_text("text") for page in document)
         except Exception as e:
             print(f"Error extracting text from PDF: {str(e)}")
             return ""
@@ -92,7 +118,50 @@ class ResumeParserAgent:
         IMPORTANT: Return ONLY the valid JSON object without any additional text, explanation, or markdown formatting.
         """
     
+    def _file_digest(self, path: str) -> Optional[str]:
+        """BLAKE2b digest of a file's bytes, None if it can't be read"""
+        try:
+            with open(path, 'rb') as f:
+                return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        except OSError:
+            return None
+    
+    def _load_cached_profile(self, digest: str) -> Optional[CandidateProfile]:
+        try:
+            with open(os.path.join(self.cache_dir, f"{digest}.json"), 'rb') as f:
+                return CandidateProfile.model_validate(orjson.loads(f.read()))
+        except (OSError, ValueError):
+            # Missing or unreadable entry, parse the resume again
+            return None
+    
+    def _store_cached_profile(self, digest: str, profile: CandidateProfile) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = os.path.join(self.cache_dir, f"{digest}.json")
+            # Write then rename so a concurrent reader never sees a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(profile.model_dump()))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error caching parsed resume: {str(e)}")
+    
     def parse_resume(self, resume_path: str) -> CandidateProfile:
+        """Parse resume file using Ollama LLM, reusing the cached result for identical files"""
+        digest = self._file_digest(resume_path) if self.cache_dir else None
+        if digest is not None:
+            cached = self._load_cached_profile(digest)
+            if cached is not None:
+                return cached
+        
+        profile = self._parse_resume_file(resume_path)
+        
+        # Only successful parses are cached; failures leave no ID or the "unknown" placeholder
+        if digest is not None and profile.candidate_id not in (None, "unknown"):
+            self._store_cached_profile(digest, profile)
+        return profile
+    
+    def _parse_resume_file(self, resume_path: str) -> CandidateProfile:
         """Parse resume file using Ollama LLM"""
         # Extract text from PDF if it's a PDF file
         if resume_path.lower().endswith('.pdf'):
@@ -111,24 +180,25 @@ class ResumeParserAgent:
         
         try:
             # Send request to Ollama API
-            response = requests.post(
+            response = self._session.post(
                 self.api_endpoint,
                 json={
                     "model": "mistral",
                     "prompt": prompt,
                     "stream": False
-                }
+                },
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
                 # Extract the generated text from Ollama response
-                generated_text = response.json().get("response", "")
+                generated_text = orjson.loads(response.content).get("response", "")
                 
                 # Clean up the generated text to ensure it's valid JSON
                 json_text = self._clean_json_response(generated_text)
                 
                 # Parse JSON into structured data
-                parsed_data = json.loads(json_text)
+                parsed_data = orjson.loads(json_text)
                 
                 # Create experience objects
                 experiences = []
@@ -165,7 +235,7 @@ class ResumeParserAgent:
 
                 
                 # Create and return CandidateProfile object
-                candidate_id = f"C-{abs(hash(resume_text)) % 10**8}"
+                candidate_id = _candidate_id_for(resume_text)
                 def safe_str(value):
                     return value if isinstance(value, str) else ""
 
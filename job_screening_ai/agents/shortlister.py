@@ -1,8 +1,16 @@
 import json
-from typing import Dict, List, Optional, Any
+import numpy as np
+from typing import Dict, List, Optional, Any, Union
 from pydantic import BaseModel, Field
 
-from .matcher import MatchResult
+from .matcher import MatchResult, MatchResultBatch
+
+def _shortlist_stats(scores: np.ndarray, mask: np.ndarray):
+    """Counts and score sums for (rejected, shortlisted) in a single pass over the scores"""
+    bins = mask.view(np.int8)
+    counts = np.bincount(bins, minlength=2)
+    sums = np.bincount(bins, weights=scores, minlength=2)
+    return counts, sums
 
 class ShortlistResult(BaseModel):
     """Model for the result of a shortlisting process"""
@@ -13,7 +21,7 @@ class ShortlistResult(BaseModel):
     shortlist_stats: Dict[str, Any] = Field(default_factory=dict)
     
     def to_dict(self) -> Dict[str, Any]:
-        return json.loads(self.json())
+        return self.model_dump()
 
 class ShortlisterAgent:
     """Agent for shortlisting candidates based on match scores"""
@@ -21,13 +29,15 @@ class ShortlisterAgent:
     def __init__(self, default_threshold: float = 70.0):
         self.default_threshold = default_threshold
     
-    def shortlist_candidates(self, match_results: List[MatchResult], threshold: Optional[float] = None) -> ShortlistResult:
-        """Shortlist candidates based on match scores"""
+    def shortlist_candidates(self, match_results: Union[List[MatchResult], MatchResultBatch],
+                             threshold: Optional[float] = None,
+                             top_k: Optional[int] = None) -> ShortlistResult:
+        """Shortlist candidates based on match scores, optionally capped at the best top_k"""
         if threshold is None:
             threshold = self.default_threshold
         
         # Check if there are any match results
-        if not match_results:
+        if len(match_results) == 0:
             return ShortlistResult(
                 job_id="unknown",
                 shortlisted_candidates=[],
@@ -43,33 +53,57 @@ class ShortlisterAgent:
                 }
             )
         
-        # Extract job ID from the first match result
-        job_id = match_results[0].job_id
+        if not isinstance(match_results, MatchResultBatch):
+            match_results = MatchResultBatch.from_match_results(match_results)
         
-        # Separate shortlisted and rejected candidates
-        shortlisted = []
-        rejected = []
+        # Extract job ID from the batch
+        job_id = match_results.job_id
         
-        shortlisted_scores = []
-        rejected_scores = []
+        total_candidates = len(match_results)
+        scores = match_results.overall_scores
+        ids = match_results.candidate_ids
         
-        for result in match_results:
-            if result.overall_match_score >= threshold:
-                shortlisted.append(result.candidate_id)
-                shortlisted_scores.append(result.overall_match_score)
+        # Degenerate thresholds (scores are 0-100) are decided without a per-candidate compare
+        if threshold > 100 or float(scores.max()) < threshold:
+            # Nobody can reach the threshold
+            shortlisted, rejected = [], ids.tolist()
+            counts, sums = (total_candidates, 0), (float(scores.sum()), 0.0)
+        elif threshold <= 0 and top_k is None:
+            # Everybody passes and nothing needs ranking
+            shortlisted, rejected = ids.tolist(), []
+            counts, sums = (0, total_candidates), (0.0, float(scores.sum()))
+        else:
+            # One vectorized compare over all scores instead of a per-candidate loop
+            mask = scores >= threshold
+            
+            if top_k is None:
+                # Separate shortlisted and rejected candidates
+                shortlisted = ids[mask].tolist()
             else:
-                rejected.append(result.candidate_id)
-                rejected_scores.append(result.overall_match_score)
+                # A top_k shortlist is always ranked, best first (ties keep input order), whether or not
+                # the cap cuts anyone; O(n) partial selection first when it does, then sort only those
+                passing = np.flatnonzero(mask)
+                k = max(top_k, 0)
+                if k < len(passing):
+                    top = np.sort(passing[np.argpartition(scores[passing], -k)[-k:]]) if k else passing[:0]
+                else:
+                    top = passing
+                top = top[np.argsort(-scores[top], kind="stable")]
+                mask = np.zeros(total_candidates, dtype=bool)
+                mask[top] = True
+                shortlisted = ids[top].tolist()
+            rejected = ids[~mask].tolist()
+            
+            # Calculate statistics; bincount fuses both counts and sums instead of re-scanning per mask
+            counts, sums = _shortlist_stats(scores, mask)
         
-        # Calculate statistics
-        total_candidates = len(match_results)
-        shortlisted_count = len(shortlisted)
-        rejected_count = len(rejected)
+        shortlisted_count = int(counts[1])
+        rejected_count = int(counts[0])
         
         shortlist_percentage = (shortlisted_count / total_candidates) * 100 if total_candidates > 0 else 0.0
         
-        avg_shortlisted_score = sum(shortlisted_scores) / shortlisted_count if shortlisted_count > 0 else 0.0
-        avg_rejected_score = sum(rejected_scores) / rejected_count if rejected_count > 0 else 0.0
+        avg_shortlisted_score = float(sums[1] / shortlisted_count) if shortlisted_count > 0 else 0.0
+        avg_rejected_score = float(sums[0] / rejected_count) if rejected_count > 0 else 0.0
         
         # Create and return ShortlistResult
         result = ShortlistResult(
@@ -1,13 +1,20 @@
 import os
-import shutil
 import uuid
 import sys
 import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Request, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 # Add parent directory to path for imports
@@ -16,17 +23,34 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from agents import (
     JobDescription, JobRequirement, JDParserAgent,
     CandidateProfile, CandidateExperience, CandidateEducation, ResumeParserAgent,
-    MatchResult, MatcherAgent,
+    MatchResult, MatchResultBatch, MatcherAgent,
     ShortlistResult, ShortlisterAgent,
     EmailResult, EmailSchedulerAgent
 )
-from database import DatabaseManager
+from database import DatabaseManager, DBError, ScorerCache
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the model-conversion and matcher caches from the DB before serving requests"""
+    try:
+        candidates = [dict_to_candidate_profile(c) for c in db.iter_candidates(columns=CANDIDATE_PROFILE_COLUMNS, limit=MAX_MATCH_CANDIDATES)]
+        jobs = [dict_to_job_description(j) for j in db.iter_job_descriptions()]
+        matcher.warm(candidates, jobs)
+    except Exception:
+        # Warming is an optimization; a bad stored row or a matcher error means serving cold, not not at all
+        logger.exception("Skipping cache warm-up")
+    yield
 
 # Initialize FastAPI app
 app = FastAPI(
     title="NeuralRecruit",
     description="API for AI-powered job screening and candidate matching",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson renders the large match/shortlist payloads much faster than stdlib json
+    default_response_class=ORJSONResponse
 )
 
 # CORS (development only)
@@ -40,6 +64,7 @@ app.add_middleware(
 
 # Initialize database and agents
 db = DatabaseManager()
+scorer_cache = ScorerCache()
 jd_parser = JDParserAgent()
 resume_parser = ResumeParserAgent()
 matcher = MatcherAgent()
@@ -79,6 +104,7 @@ class MatchRequest(BaseModel):
 class ShortlistRequest(BaseModel):
     job_id: str
     threshold: Optional[float] = 70.0
+    top_k: Optional[int] = None
 
 class EmailRequest(BaseModel):
     job_id: str
@@ -112,88 +138,175 @@ class EmailScheduleResponse(BaseModel):
     status: str
 
 # ------------------ Helpers ------------------ #
-def save_upload_file(upload_file: UploadFile, destination: str, filename: Optional[str] = None) -> str:
-    """Save an uploaded file to destination (with optional custom filename)"""
+async def save_upload_file(upload_file: UploadFile, destination: str, filename: Optional[str] = None) -> Tuple[str, bytes]:
+    """Save an uploaded file to destination (with optional custom filename) and return its path and bytes"""
     name = filename or upload_file.filename
     file_path = os.path.join(destination, name)
+    # Read once and hand the bytes back so callers don't re-read the file from disk
+    data = await upload_file.read()
     with open(file_path, "wb") as buf:
-        shutil.copyfileobj(upload_file.file, buf)
-    return file_path
+        buf.write(data)
+    return file_path, data
+
+
+# Columns dict_to_candidate_profile needs (plus the row version for its cache)
+CANDIDATE_PROFILE_COLUMNS = [
+    "candidate_id", "name", "email", "phone", "location", "linkedin", "summary",
+    "skills", "experience", "education", "certifications", "languages", "created_at", "updated_at"
+]
+# Upper bound on candidates matched when the request doesn't name any
+MAX_MATCH_CANDIDATES = 10_000
+
+# Converted models keyed by (id, row version); rows get a fresh updated_at whenever they are written
+_MODEL_CACHE_SIZE = 10_000
+_job_cache: "OrderedDict[Tuple[Any, str], JobDescription]" = OrderedDict()
+_candidate_cache: "OrderedDict[Tuple[Any, str], CandidateProfile]" = OrderedDict()
+
+
+def _coerce_json(value: Any, default: Any) -> Any:
+    """Decode a JSON column, passing through values that are already decoded"""
+    if not isinstance(value, str):
+        return default if value is None else value
+    if not value:
+        # Empty columns are stored as '' by the insert helpers; don't pay for a decode error
+        return default
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return default
+
+
+def _cached_model(cache: OrderedDict, row: Dict[str, Any], id_key: str, build):
+    """LRU lookup of a converted row, building it on a miss"""
+    version = row.get("updated_at") or row.get("created_at")
+    if version is None:
+        # Not a DB row, so there is nothing to key the cache on
+        return build(row)
+    key = (row.get(id_key), version)
+    model = cache.get(key)
+    if model is None:
+        model = cache[key] = build(row)
+        if len(cache) > _MODEL_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return model
+
+
+def _build_job_description(job_dict: Dict[str, Any]) -> JobDescription:
+    """Convert dict to JobDescription"""
+    # One model_validate over the nested data runs entirely in pydantic-core
+    return JobDescription.model_validate({
+        "job_id": job_dict.get("job_id"),
+        "title": job_dict.get("title", ""),
+        "company": job_dict.get("company", ""),
+        "location": job_dict.get("location", ""),
+        "job_type": job_dict.get("job_type", ""),
+        "description": job_dict.get("description", ""),
+        "responsibilities": _coerce_json(job_dict.get("responsibilities"), []),
+        "requirements": _coerce_json(job_dict.get("requirements"), {}),
+        "salary_range": job_dict.get("salary_range", ""),
+        "posting_date": job_dict.get("posting_date", ""),
+        "department": job_dict.get("department", "")
+    })
+
+
+def _build_candidate_profile(candidate_dict: Dict[str, Any]) -> CandidateProfile:
+    """Convert dict to CandidateProfile"""
+    # Nested experience/education dicts are validated in the same pass, not one model at a time
+    return CandidateProfile.model_validate({
+        "candidate_id": candidate_dict.get("candidate_id"),
+        "name": candidate_dict.get("name", ""),
+        "email": candidate_dict.get("email", ""),
+        "phone": candidate_dict.get("phone", ""),
+        "location": candidate_dict.get("location", ""),
+        "linkedin": candidate_dict.get("linkedin", ""),
+        "summary": candidate_dict.get("summary", ""),
+        "skills": _coerce_json(candidate_dict.get("skills"), []),
+        "experience": _coerce_json(candidate_dict.get("experience"), []),
+        "education": _coerce_json(candidate_dict.get("education"), []),
+        "certifications": _coerce_json(candidate_dict.get("certifications"), []),
+        "languages": _coerce_json(candidate_dict.get("languages"), [])
+    })
 
 
 def dict_to_job_description(job_dict: Dict[str, Any]) -> JobDescription:
-    """Convert dict to JobDescription"""
-    req = job_dict.get("requirements", {})
-    if isinstance(req, str):
-        try:
-            req = json.loads(req)
-        except json.JSONDecodeError:
-            req = {}
-    requirements = JobRequirement(
-        required_skills=req.get("required_skills", []),
-        preferred_skills=req.get("preferred_skills", []),
-        experience=req.get("experience", ""),
-        education=req.get("education", [])
-    )
-    return JobDescription(
-        job_id=job_dict.get("job_id"),
-        title=job_dict.get("title", ""),
-        company=job_dict.get("company", ""),
-        location=job_dict.get("location", ""),
-        job_type=job_dict.get("job_type", ""),
-        description=job_dict.get("description", ""),
-        responsibilities=job_dict.get("responsibilities", []),
-        requirements=requirements,
-        salary_range=job_dict.get("salary_range", ""),
-        posting_date=job_dict.get("posting_date", ""),
-        department=job_dict.get("department", "")
-    )
+    """Convert dict to JobDescription, reusing the model built for an unchanged row"""
+    return _cached_model(_job_cache, job_dict, "job_id", _build_job_description)
 
 
 def dict_to_candidate_profile(candidate_dict: Dict[str, Any]) -> CandidateProfile:
-    """Convert dict to CandidateProfile"""
-    # Experiences
-    exp_list = candidate_dict.get("experience", [])
-    if isinstance(exp_list, str):
-        try:
-            exp_list = json.loads(exp_list)
-        except json.JSONDecodeError:
-            exp_list = []
-    experiences = [CandidateExperience(**exp) for exp in exp_list]
-    # Education
-    edu_list = candidate_dict.get("education", [])
-    if isinstance(edu_list, str):
+    """Convert dict to CandidateProfile, reusing the model built for an unchanged row"""
+    return _cached_model(_candidate_cache, candidate_dict, "candidate_id", _build_candidate_profile)
+
+# ------------------ Email worker ------------------ #
+EMAIL_TYPES = ("interview_invitation", "rejection")
+EMAIL_BATCH_SIZE = 10
+EMAIL_MAX_ATTEMPTS = 3
+EMAIL_RETRY_BASE_DELAY = 1.0  # seconds, doubled on every retry
+
+# Failures that a retry can't fix
+_PERMANENT_EMAIL_ERRORS = ("Invalid email address", "Email credentials not configured")
+
+_email_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+
+def _send_email_batch(job: JobDescription, candidates: List[CandidateProfile], email_type: str, num_slots: int) -> List[EmailResult]:
+    """Send one batch of emails of the given type"""
+    if email_type == "interview_invitation":
+        return email_scheduler.send_batch_interview_invitations(job, candidates, num_slots)
+    return [email_scheduler.send_rejection_email(job, cand) for cand in candidates]
+
+
+def _process_email_task(task: Dict[str, Any], worker_db: DatabaseManager) -> None:
+    """Send a queued email job in batches, retrying transient failures with exponential backoff"""
+    job, candidates = task["job"], task["candidates"]
+    for start in range(0, len(candidates), EMAIL_BATCH_SIZE):
+        pending = candidates[start:start + EMAIL_BATCH_SIZE]
+        final: Dict[str, EmailResult] = {}
+        for attempt in range(EMAIL_MAX_ATTEMPTS):
+            retry = []
+            for cand, er in zip(pending, _send_email_batch(job, pending, task["email_type"], task["num_slots"])):
+                final[cand.candidate_id] = er
+                if not er.success and not er.message.startswith(_PERMANENT_EMAIL_ERRORS):
+                    retry.append(cand)
+            pending = retry
+            if not pending or attempt == EMAIL_MAX_ATTEMPTS - 1:
+                break
+            time.sleep(EMAIL_RETRY_BASE_DELAY * 2 ** attempt)
+        
+        rows = []
+        for er in final.values():
+            ed = er.to_dict()
+            ed["email_type"] = task["email_type"]
+            rows.append(ed)
+        worker_db.insert_emails_bulk(rows)
+
+
+def _email_worker() -> None:
+    """Long-lived thread draining the email queue"""
+    while True:
+        task = _email_queue.get()
         try:
-            edu_list = json.loads(edu_list)
-        except json.JSONDecodeError:
-            edu_list = []
-    educations = [CandidateEducation(**edu) for edu in edu_list]
-    # Skills, certs, languages
-    def load_list(key):
-        v = candidate_dict.get(key, [])
-        if isinstance(v, str):
-            try:
-                v = json.loads(v)
-            except:
-                v = []
-        return v
-    skills = load_list("skills")
-    certifications = load_list("certifications")
-    languages = load_list("languages")
-    return CandidateProfile(
-        candidate_id=candidate_dict.get("candidate_id"),
-        name=candidate_dict.get("name", ""),
-        email=candidate_dict.get("email", ""),
-        phone=candidate_dict.get("phone", ""),
-        location=candidate_dict.get("location", ""),
-        linkedin=candidate_dict.get("linkedin", ""),
-        summary=candidate_dict.get("summary", ""),
-        skills=skills,
-        experience=experiences,
-        education=educations,
-        certifications=certifications,
-        languages=languages
-    )
+            # The manager's writer lock and reader pool make it safe to share with the request handlers
+            _process_email_task(task, db)
+        except Exception as e:
+            print(f"Error processing email job: {e}")
+        finally:
+            _email_queue.task_done()
+
+
+threading.Thread(target=_email_worker, name="email-worker", daemon=True).start()
+
+def _store_job_description(job: JobDescription) -> None:
+    """Persist a parsed JD; re-submitting the same text maps to the same job_id and keeps the stored row
+    (job IDs are a 64-bit digest of the text, so a conflict means the same JD, not a different one)"""
+    try:
+        db.insert_job_description(job.to_dict())
+    except DBError as e:
+        if not isinstance(e.__cause__, sqlite3.IntegrityError):
+            raise
+
 
 # ------------------ Routes ------------------ #
 @app.get("/", tags=["Health"])
@@ -221,7 +334,7 @@ async def parse_job_description(
 
         # 4. Existing parsing logic
         parsed = jd_parser.parse_job_description(jd_text)
-        db.insert_job_description(parsed.to_dict())
+        _store_job_description(parsed)
 
         return {
             "job_id": parsed.job_id,
@@ -235,12 +348,12 @@ async def parse_job_description(
 
 @app.post("/upload-jd/", response_model=ParseJobResponse, tags=["JobDescription"])
 async def upload_job_description(job_description_file: UploadFile = File(...)):
-    path = save_upload_file(job_description_file, JD_DIR)
-    text = open(path, encoding="utf-8").read()
+    path, data = await save_upload_file(job_description_file, JD_DIR)
+    text = data.decode("utf-8")
     if not text.strip():
         raise HTTPException(status_code=400, detail="Uploaded file is empty")
     parsed = jd_parser.parse_job_description(text)
-    db.insert_job_description(parsed.to_dict())
+    _store_job_description(parsed)
     return {"job_id": parsed.job_id, "title": parsed.title, "company": parsed.company, "success": True}
 
 @app.post("/parse-resume/", response_model=ParseResumeResponse, tags=["Resume"])
@@ -248,9 +361,10 @@ async def parse_resume(resume_file: UploadFile = File(...)):
     try:
         ext = os.path.splitext(resume_file.filename)[1]
         fname = f"{uuid.uuid4()}{ext}"
-        path = save_upload_file(resume_file, RESUME_DIR, fname)
+        path, _ = await save_upload_file(resume_file, RESUME_DIR, fname)
         parsed = resume_parser.parse_resume(path)
         db.insert_candidate(parsed.to_dict())
+        matcher.warm([parsed])
         return {"candidate_id": parsed.candidate_id, "name": parsed.name, "email": parsed.email, "skills": parsed.skills, "success": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -262,16 +376,34 @@ async def match_candidates(match_request: MatchRequest):
         if not job_dict:
             raise HTTPException(status_code=404, detail="Job not found")
         job = dict_to_job_description(job_dict)
-        cdicts = match_request.candidate_ids and [db.get_candidate(cid) for cid in match_request.candidate_ids] or db.get_all_candidates()
-        cdicts = [c for c in cdicts if c]
+        # One bulk SELECT for the candidates and one bulk INSERT for the matches
+        if match_request.candidate_ids is not None:
+            cdicts = db.get_candidates(match_request.candidate_ids)
+        else:
+            cdicts = db.get_all_candidates(columns=CANDIDATE_PROFILE_COLUMNS, limit=MAX_MATCH_CANDIDATES)
         candidates = [dict_to_candidate_profile(c) for c in cdicts]
+        # Reuse cached scores for unchanged (job, resume) pairs; only match the misses
+        job_hash = ScorerCache.fingerprint(job.model_dump_json())
+        resume_hashes = {cand.candidate_id: ScorerCache.fingerprint(cand.model_dump_json()) for cand in candidates}
+        scores = scorer_cache.get_many(job.job_id, job_hash, resume_hashes)
+        misses = [cand for cand in candidates if cand.candidate_id not in scores]
+        # LLM evaluations run concurrently on the event loop instead of one blocking call per candidate
+        match_results = await matcher.amatch_candidates_to_job(job, misses)
+        fresh = {cand.candidate_id: mr.to_dict() for cand, mr in zip(misses, match_results)}
+        # Fallback scores (LLM down or timing out) aren't cached, so those pairs are re-evaluated next time
+        scorer_cache.put_many(job.job_id, job_hash, [
+            (cid, resume_hashes[cid], d) for cid, d in fresh.items()
+            if d["match_details"].get("evaluation") != "fallback"
+        ])
+        scores.update(fresh)
+        # One timestamp for the whole batch
+        match_date = datetime.now().isoformat()
         results = []
         for cand in candidates:
-            mr = matcher.match_candidate_to_job(job, candidate=cand)
-            d = mr.to_dict()
-            d.update({"job_id": job.job_id, "candidate_id": cand.candidate_id, "match_date": datetime.now().isoformat()})
-            db.insert_match(d)
+            d = dict(scores[cand.candidate_id])
+            d.update({"job_id": job.job_id, "candidate_id": cand.candidate_id, "match_date": match_date})
             results.append(d)
+        db.insert_matches_bulk(results)
         return {"job_title": job.title, "company": job.company, "candidates_matched": len(results), "matches": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -282,57 +414,37 @@ async def shortlist_candidates(shortlist_request: ShortlistRequest):
         job_dict = db.get_job_description(shortlist_request.job_id)
         if not job_dict:
             raise HTTPException(status_code=404, detail="Job not found")
-        matches = db.get_matches_for_job(shortlist_request.job_id)
+        # Shortlisting only needs IDs and scores; skip match details and candidate profiles
+        matches = db.get_match_scores_for_job(shortlist_request.job_id)
         if not matches:
             return {"job_title": job_dict.get("title"), "company": job_dict.get("company"), "threshold_score": shortlist_request.threshold, "total_candidates": 0, "shortlisted_count": 0, "shortlisted_candidates": []}
-        job = dict_to_job_description(job_dict)
-        
-        # Convert dictionary matches to MatchResult objects
-        match_results = []
-        for match in matches:
-            # Create a MatchResult object from the match dictionary
-            match_result = MatchResult(
-                job_id=match["job_id"],
-                candidate_id=match["candidate_id"],
-                overall_match_score=match.get("overall_match_score", 0),
-                skill_match_score=match.get("skill_match_score", 0),
-                experience_match_score=match.get("experience_match_score", 0),
-                education_match_score=match.get("education_match_score", 0),
-                match_details=match.get("match_details", {})
-            )
-            match_results.append(match_result)
         
-        # Now call shortlist_candidates with the list of MatchResult objects
-        sr = shortlister.shortlist_candidates(match_results, threshold=shortlist_request.threshold)
+        # Score columns straight from the match rows; no per-row MatchResult objects needed
+        match_batch = MatchResultBatch.from_rows(shortlist_request.job_id, matches)
+        sr = shortlister.shortlist_candidates(match_batch, threshold=shortlist_request.threshold, top_k=shortlist_request.top_k)
         
-        # Update shortlist status in the matches table
-        for match in matches:
-            candidate_id = match["candidate_id"]
-            is_shortlisted = candidate_id in sr.shortlisted_candidates
-            db.update_shortlist_status(shortlist_request.job_id, candidate_id, is_shortlisted)
+        # Update shortlist status in the matches table with one bulk transaction
+        db.bulk_update_shortlist_status(shortlist_request.job_id, sr.shortlisted_candidates, sr.rejected_candidates)
         
-        return {"job_title": job.title, "company": job.company, "threshold_score": shortlist_request.threshold, "total_candidates": len(matches), "shortlisted_count": len(sr.shortlisted_candidates), "shortlisted_candidates": sr.shortlisted_candidates}
+        return {"job_title": job_dict.get("title"), "company": job_dict.get("company"), "threshold_score": shortlist_request.threshold, "total_candidates": len(matches), "shortlisted_count": len(sr.shortlisted_candidates), "shortlisted_candidates": sr.shortlisted_candidates}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/schedule-emails/", response_model=EmailScheduleResponse, tags=["Email"])
-async def schedule_emails(email_request: EmailRequest, background_tasks: BackgroundTasks):
+async def schedule_emails(email_request: EmailRequest):
     try:
         job_dict = db.get_job_description(email_request.job_id)
         if not job_dict:
             raise HTTPException(status_code=404, detail="Job not found")
+        if email_request.email_type not in EMAIL_TYPES:
+            raise HTTPException(status_code=400, detail=f"Unknown email_type: {email_request.email_type}")
         job = dict_to_job_description(job_dict)
-        cdicts = [db.get_candidate(cid) for cid in email_request.candidate_ids]
-        cdicts = [c for c in cdicts if c]
-        candidates = [dict_to_candidate_profile(c) for c in cdicts]
-        def task():
-            for cand in candidates:
-                er = email_scheduler.generate_email(cand, job, email_request.email_type, email_request.num_slots)
-                ed = er.to_dict()
-                ed.update({"job_id": job.job_id, "candidate_id": cand.candidate_id, "email_type": email_request.email_type, "scheduled_date": datetime.now().isoformat()})
-                db.insert_email(ed)
-        background_tasks.add_task(task)
-        return {"message": "Email scheduling started", "job_title": job.title, "company": job.company, "email_type": email_request.email_type, "candidates": len(candidates), "status": "processing"}
+        candidates = [dict_to_candidate_profile(c) for c in db.get_candidates(email_request.candidate_ids)]
+        # Hand off to the email worker and return right away
+        _email_queue.put({"job": job, "candidates": candidates, "email_type": email_request.email_type, "num_slots": email_request.num_slots})
+        return {"message": "Email scheduling queued", "job_title": job.title, "company": job.company, "email_type": email_request.email_type, "candidates": len(candidates), "status": "queued"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -377,13 +489,22 @@ async def get_candidate(candidate_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/matches/{job_id}", tags=["Matching"])
-async def get_matches_for_job(job_id: str):
+async def get_matches_for_job(job_id: str, details: bool = False):
     try:
-        matches = db.get_matches_for_job(job_id)
+        # match_details is heavy and only fetched on request (?details=1); GET /matches/{job_id}/{candidate_id}
+        # returns it for a single match
+        matches = db.get_matches_for_job(job_id, details=details)
         return {"job_id": job_id, "matches": matches, "count": len(matches)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/matches/{job_id}/{candidate_id}", tags=["Matching"])
+async def get_match_details(job_id: str, candidate_id: str):
+    details = db.get_match_details(job_id, candidate_id)
+    if details is None:
+        raise HTTPException(status_code=404, detail="Match not found")
+    return {"job_id": job_id, "candidate_id": candidate_id, "match_details": details}
+
 @app.get("/shortlists/{job_id}", tags=["Shortlisting"])
 async def get_shortlist_for_job(job_id: str):
     try:
@@ -392,6 +513,14 @@ async def get_shortlist_for_job(job_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/shortlists/{job_id}/summary", tags=["Shortlisting"])
+async def get_shortlist_summary_for_job(job_id: str):
+    try:
+        summary = db.get_shortlisted_summary(job_id)
+        return {"job_id": job_id, "shortlist": summary, "count": len(summary)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.delete("/jobs/{job_id}", tags=["JobDescription"])
 async def delete_job(job_id: str):
     try:
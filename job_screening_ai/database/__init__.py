@@ -1,2 +1,3 @@
 # job_screening_ai/database/__init__.py
-from .db_manager import DatabaseManager
\ No newline at end of file
+from .db_manager import DatabaseManager, DBError
+from .scorer_cache import ScorerCache, DenseScorerCache
\ No newline at end of file
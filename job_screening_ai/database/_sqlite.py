@@ -0,0 +1,34 @@
+# job_screening_ai/database/_sqlite.py
+
+import sqlite3
+import orjson
+from typing import Any
+
+# Stay under SQLite's default host-parameter limit (999 before 3.32)
+MAX_IN_PARAMS = 900
+
+# Applied to every connection: WAL lets readers run alongside the writer and, with synchronous=NORMAL,
+# commits no longer fsync the journal each time; the rest enlarges the page cache and maps the file
+CONNECTION_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "cache_size=-64000",
+    "mmap_size=268435456",
+)
+
+# numpy scalars and non-string keys serialize the way they did with stdlib json
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def apply_pragmas(conn: sqlite3.Connection) -> None:
+    """Apply the shared CONNECTION_PRAGMAS to a freshly opened connection"""
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(f"PRAGMA {pragma}")
+
+def json_dumps(value: Any) -> str:
+    """Serialize to JSON text for a TEXT column (orjson is several times faster than stdlib json)"""
+    return orjson.dumps(value, option=_ORJSON_OPTIONS).decode()
+
+def json_loads(value: Any) -> Any:
+    """Parse a JSON TEXT column"""
+    return orjson.loads(value)
@@ -1,30 +1,373 @@
 # job_screening_ai/database/db_manager.py
 
 import os
+import queue
 import sqlite3
-import json
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+import orjson
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 import datetime
+import logging
+import itertools
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from ._sqlite import MAX_IN_PARAMS, apply_pragmas, json_dumps, json_loads
+
+logger = logging.getLogger(__name__)
+
+class DBError(Exception):
+    """A database operation failed; raised from the underlying sqlite3.Error"""
+
+# Let sqlite3 bind datetimes itself (same ISO text the inserts used to build per row); the methods
+# are C-level, so there's no Python callback per value
+sqlite3.register_adapter(datetime.datetime, datetime.datetime.isoformat)
+sqlite3.register_adapter(datetime.date, datetime.date.isoformat)
+
+def _json_param(value: Any) -> Any:
+    """Serialize a JSON column value, passing through text the caller already serialized (and None)"""
+    if value is None or isinstance(value, (str, bytes)):
+        return value
+    return json_dumps(value)
+
+def _dict_factory(cursor: sqlite3.Cursor, row: Tuple) -> Dict[str, Any]:
+    """Row factory building a plain dict straight from the column names"""
+    return dict(zip([column[0] for column in cursor.description], row))
+
+def _keys_factory(keys: Tuple[str, ...]):
+    """Row factory for a fixed projection: zips a prebuilt key tuple instead of reading cursor.description"""
+    def factory(cursor: sqlite3.Cursor, row: Tuple) -> Dict[str, Any]:
+        return dict(zip(keys, row))
+    return factory
+
+def _json_row_factory(json_fields: Dict[str, type]):
+    """Row factory for a table's rows: a dict with the given JSON columns parsed (empty container if malformed)"""
+    def factory(cursor: sqlite3.Cursor, row: Tuple) -> Dict[str, Any]:
+        row_dict = _dict_factory(cursor, row)
+        for field, empty in json_fields.items():
+            value = row_dict.get(field)
+            if value:
+                try:
+                    row_dict[field] = json_loads(value)
+                except orjson.JSONDecodeError:
+                    row_dict[field] = empty()
+        return row_dict
+    return factory
+
+# JSON-encoded columns of the candidates table
+_CAND_JSON_FIELDS = ("skills", "experience", "education", "certifications", "languages")
+
+_job_factory = _json_row_factory({'responsibilities': list, 'requirements': dict})
+_candidate_factory = _json_row_factory({field: list for field in _CAND_JSON_FIELDS})
+_match_factory = _json_row_factory({'match_details': dict})
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER; bounds how many rows fit in one multi-VALUES INSERT
+_MAX_VARIABLES = 999
+
+# Column order of the positional rows built by _candidate_row / _match_row
+_CANDIDATE_COLUMNS = (
+    'candidate_id', 'name', 'email', 'phone', 'location', 'linkedin', 'summary',
+    'skills', 'experience', 'education', 'certifications', 'languages', 'resume_path', 'updated_at'
+)
+_MATCH_COLUMNS = (
+    'job_id', 'candidate_id', 'overall_match_score',
+    'skill_match_score', 'experience_match_score', 'education_match_score',
+    'match_details', 'is_shortlisted'
+)
+
+# Rows pulled per fetchmany() when streaming result sets
+_FETCH_BATCH = 500
+
+# Indexes behind the per-job match reads; the shortlist one is partial so it only holds shortlisted rows
+_MATCH_INDEXES = {
+    "idx_matches_job_score": "CREATE INDEX IF NOT EXISTS idx_matches_job_score ON matches (job_id, overall_match_score DESC)",
+    "idx_matches_shortlisted": (
+        "CREATE INDEX IF NOT EXISTS idx_matches_shortlisted ON matches (job_id, overall_match_score DESC) "
+        "WHERE is_shortlisted = 1"
+    ),
+}
+_EMAIL_INDEX_SQL = "CREATE INDEX IF NOT EXISTS idx_emails_cand_job ON emails (candidate_id, job_id, created_at DESC)"
+
+# Link tables mirroring list-valued JSON columns as one (owner, value) row per entry, so "who has skill X"
+# is an index scan instead of decoding every row's JSON; the JSON columns remain the source for display.
+# table -> (owner column, value column, source table, source JSON column, JSON path of the list)
+_LINK_TABLES = {
+    "candidate_skills": ("candidate_id", "skill", "candidates", "skills", "$"),
+    "candidate_certifications": ("candidate_id", "certification", "candidates", "certifications", "$"),
+    "candidate_languages": ("candidate_id", "language", "candidates", "languages", "$"),
+    "job_required_skills": ("job_id", "skill", "job_descriptions", "requirements", "$.required_skills"),
+}
+_SKILL_MATCH_KEYS = ("candidate_id", "hits")
+
+# SQL for the fixed-shape statements, kept as constants so every call passes the identical string
+# and hits the connection's prepared-statement cache
+_INSERT_JOB_SQL = """
+INSERT INTO job_descriptions (
+    job_id, title, company, location, job_type, description,
+    responsibilities, requirements, salary_range,
+    posting_date, department, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SELECT_JOB_SQL = "SELECT * FROM job_descriptions WHERE job_id = ?"
+_SELECT_ALL_JOBS_SQL = "SELECT * FROM job_descriptions ORDER BY created_at DESC"
+_DELETE_JOB_SQL = "DELETE FROM job_descriptions WHERE job_id = ?"
+# Candidate IDs are derived from the resume text, so re-uploading a resume refreshes its existing row
+# (keeping created_at) instead of failing on the primary key
+_CANDIDATE_UPSERT_CLAUSE = """
+ON CONFLICT(candidate_id) DO UPDATE SET
+""" + ",\n".join(f"    {column} = excluded.{column}" for column in _CANDIDATE_COLUMNS[1:]) + "\n"
+_INSERT_CANDIDATE_SQL = """
+INSERT INTO candidates (
+    candidate_id, name, email, phone, location, linkedin, summary,
+    skills, experience, education, certifications, languages, resume_path, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+""" + _CANDIDATE_UPSERT_CLAUSE
+_SELECT_CANDIDATE_SQL = "SELECT * FROM candidates WHERE candidate_id = ?"
+_DELETE_CANDIDATE_SQL = "DELETE FROM candidates WHERE candidate_id = ?"
+# Re-matching updates the existing row in place (UPSERT, SQLite 3.24+) rather than OR REPLACE's
+# delete + re-insert, so match_id stays stable and the indexes aren't rewritten for every row
+_MATCH_UPSERT_CLAUSE = """
+ON CONFLICT(job_id, candidate_id) DO UPDATE SET
+    overall_match_score = excluded.overall_match_score,
+    skill_match_score = excluded.skill_match_score,
+    experience_match_score = excluded.experience_match_score,
+    education_match_score = excluded.education_match_score,
+    match_details = excluded.match_details,
+    is_shortlisted = excluded.is_shortlisted,
+    created_at = CURRENT_TIMESTAMP
+"""
+_INSERT_MATCH_SQL = """
+INSERT INTO matches (
+    job_id, candidate_id, overall_match_score,
+    skill_match_score, experience_match_score, education_match_score,
+    match_details, is_shortlisted
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+""" + _MATCH_UPSERT_CLAUSE
+# Result keys of the fixed-shape list queries below, in SELECT order
+_MATCH_LIST_KEYS = (
+    "match_id", "job_id", "candidate_id", "overall_match_score", "skill_match_score",
+    "experience_match_score", "education_match_score", "is_shortlisted", "created_at",
+    "candidate_name", "candidate_email"
+)
+_MATCH_SCORE_KEYS = (
+    "candidate_id", "overall_match_score", "skill_match_score",
+    "experience_match_score", "education_match_score"
+)
+_EMAIL_KEYS = (
+    "email_id", "candidate_id", "job_id", "email_to", "email_type",
+    "subject", "body", "success", "message", "sent_at", "created_at"
+)
+_SHORTLIST_SUMMARY_KEYS = ("candidate_id", "name", "email", "n_skills", "overall_match_score")
+_match_list_factory = _keys_factory(_MATCH_LIST_KEYS)
+_match_score_factory = _keys_factory(_MATCH_SCORE_KEYS)
+_email_factory = _keys_factory(_EMAIL_KEYS)
+_shortlist_summary_factory = _keys_factory(_SHORTLIST_SUMMARY_KEYS)
+_skill_match_factory = _keys_factory(_SKILL_MATCH_KEYS)
+
+# List views select only what they show; match_details comes from _SELECT_MATCH_DETAILS_SQL on demand,
+# or with every row when a caller opts in
+_MATCHES_FOR_JOB_SQL_TEMPLATE = """
+SELECT m.match_id, m.job_id, m.candidate_id, m.overall_match_score, m.skill_match_score,
+       m.experience_match_score, m.education_match_score, m.is_shortlisted, m.created_at,
+       c.name as candidate_name, c.email as candidate_email{details}
+FROM matches m
+JOIN candidates c ON m.candidate_id = c.candidate_id
+WHERE m.job_id = ?
+ORDER BY m.overall_match_score DESC
+"""
+_SELECT_MATCHES_FOR_JOB_SQL = _MATCHES_FOR_JOB_SQL_TEMPLATE.format(details="")
+_SELECT_MATCHES_WITH_DETAILS_FOR_JOB_SQL = _MATCHES_FOR_JOB_SQL_TEMPLATE.format(details=", m.match_details")
+_SELECT_MATCH_SCORES_SQL = """
+SELECT m.candidate_id, m.overall_match_score, m.skill_match_score,
+       m.experience_match_score, m.education_match_score
+FROM matches m
+JOIN candidates c ON m.candidate_id = c.candidate_id
+WHERE m.job_id = ?
+ORDER BY m.overall_match_score DESC
+"""
+_SELECT_MATCH_DETAILS_SQL = "SELECT match_details FROM matches WHERE job_id = ? AND candidate_id = ?"
+_SELECT_SHORTLISTED_SQL = """
+SELECT c.candidate_id, c.name, c.email, c.phone, c.location, c.linkedin, c.skills,
+       m.overall_match_score, m.skill_match_score,
+       m.experience_match_score, m.education_match_score
+FROM matches m
+JOIN candidates c ON m.candidate_id = c.candidate_id
+WHERE m.job_id = ? AND m.is_shortlisted = 1
+ORDER BY m.overall_match_score DESC
+"""
+# Counts skills inside SQLite (json1) so no resume JSON is shipped to Python; '' and bad JSON count as 0
+_SELECT_SHORTLIST_SUMMARY_SQL = """
+SELECT c.candidate_id, c.name, c.email,
+       CASE WHEN json_valid(c.skills) THEN json_array_length(c.skills) ELSE 0 END AS n_skills,
+       m.overall_match_score
+FROM matches m
+JOIN candidates c ON m.candidate_id = c.candidate_id
+WHERE m.job_id = ? AND m.is_shortlisted = 1
+ORDER BY m.overall_match_score DESC
+"""
+# Exact (case-insensitive) overlap between each candidate's skills and a job's required skills
+_SELECT_SKILL_MATCHES_SQL = """
+SELECT cs.candidate_id, COUNT(*) AS hits
+FROM job_required_skills js
+JOIN candidate_skills cs ON cs.skill = js.skill
+WHERE js.job_id = ?
+GROUP BY cs.candidate_id
+ORDER BY hits DESC
+"""
+_INSERT_EMAIL_SQL = """
+INSERT INTO emails (
+    candidate_id, job_id, email_to, email_type,
+    subject, body, success, message, sent_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+# Two constant statements rather than one "(? IS NULL OR job_id = ?)": the OR keeps the planner from
+# seeking on job_id, so the filtered lookup would lose its index range and sort in a temp B-tree
+_SELECT_EMAILS_FOR_CANDIDATE_JOB_SQL = f"""
+SELECT {", ".join(_EMAIL_KEYS)} FROM emails
+WHERE candidate_id = ? AND job_id = ?
+ORDER BY created_at DESC
+"""
+_SELECT_EMAILS_FOR_CANDIDATE_SQL = f"""
+SELECT {", ".join(_EMAIL_KEYS)} FROM emails
+WHERE candidate_id = ?
+ORDER BY created_at DESC
+"""
+_DELETE_NULL_JOBS_SQL = "DELETE FROM job_descriptions WHERE job_id IS NULL OR TRIM(job_id) = ''"
+
+def _open_connection(db_path: str) -> sqlite3.Connection:
+    """Open a connection usable from any thread, with the shared PRAGMAs applied"""
+    # Room for the fixed statements plus the per-chunk-size IN (...) variants;
+    # autocommit mode so _transaction() controls BEGIN/COMMIT explicitly
+    conn = sqlite3.connect(db_path, cached_statements=256, isolation_level=None, check_same_thread=False)
+    apply_pragmas(conn)
+    conn.row_factory = _dict_factory  # Return rows as dictionaries
+    return conn
+
+class _ConnPool:
+    """Bounded pool of read connections, opened on first use; WAL lets them read while the writer writes"""
+    
+    def __init__(self, db_path: str, size: int, timeout: Optional[float] = 30.0):
+        self.db_path = db_path
+        self.size = size
+        # Seconds to wait for a connection when all are in use (None waits forever)
+        self.timeout = timeout
+        self._idle: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._opened: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> sqlite3.Connection:
+        """An idle connection, a new one while under the size limit, or wait for one to be released;
+        DBError if none comes back within the timeout (contention or a leaked connection)"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._opened) < self.size:
+                conn = _open_connection(self.db_path)
+                self._opened.append(conn)
+                return conn
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            logger.error("No read connection became available within %s seconds", self.timeout)
+            raise DBError(f"Timed out after {self.timeout} seconds waiting for a database connection") from None
+    
+    def release(self, conn: sqlite3.Connection) -> None:
+        self._idle.put(conn)
+    
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._opened:
+                conn.close()
+            self._opened.clear()
+
+class _LRUCache:
+    """Thread-safe bounded LRU map with hit/miss counters"""
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # Bumped by every invalidation so a read that raced a write can't store its stale row
+        self.generation = 0
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: str, value: Dict[str, Any], generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def invalidate(self, keys: Optional[List[str]] = None) -> None:
+        """Drop the given keys, or everything when no keys are given"""
+        with self._lock:
+            self.generation += 1
+            if keys is None:
+                self._data.clear()
+            else:
+                for key in keys:
+                    self._data.pop(key, None)
+    
+    def info(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
 
 class DatabaseManager:
     """Manager for the SQLite database operations"""
     
-    def __init__(self, db_path: str = "job_screening.db"):
-        """Initialize database connection and create tables if they don't exist"""
+    def __init__(self, db_path: str = "job_screening.db", pool_size: int = 4, cache_size: int = 4096,
+                 pool_timeout: Optional[float] = 30.0):
+        """Initialize database connections and create tables if they don't exist"""
         self.db_path = db_path
         self.conn = None
         self.cursor = None
+        # One writer connection (SQLite allows a single writer at a time) serialized by a lock,
+        # plus a pool of readers so concurrent getters don't queue behind each other
+        self._write_lock = threading.RLock()
+        self._readers = _ConnPool(db_path, pool_size, pool_timeout)
+        # Decoded rows of the by-ID lookups the matching pipeline repeats; writes invalidate them
+        self._job_cache = _LRUCache(cache_size)
+        self._candidate_cache = _LRUCache(cache_size)
         self._connect()
         self._create_tables()
     
     def _connect(self):
         """Connect to the SQLite database"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+            self.conn = _open_connection(self.db_path)
             self.cursor = self.conn.cursor()
         except sqlite3.Error as e:
-            print(f"Database connection error: {e}")
+            logger.exception("Database connection error")
+            raise DBError(f"Database connection error: {e}") from e
+    
+    @contextmanager
+    def _ro(self):
+        """Borrow a read connection from the pool"""
+        conn = self._readers.acquire()
+        try:
+            yield conn
+        finally:
+            self._readers.release(conn)
+    
+    @contextmanager
+    def _rw(self):
+        """Hold the writer connection's cursor for the duration of the block"""
+        with self._write_lock:
+            yield self.cursor
     
     def _create_tables(self):
         """Create necessary tables if they don't exist"""
@@ -43,7 +386,8 @@ class DatabaseManager:
                 salary_range TEXT,
                 posting_date TEXT,
                 department TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP
             )
             ''')
             
@@ -63,7 +407,8 @@ class DatabaseManager:
                 certifications TEXT,
                 languages TEXT,
                 resume_path TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP
             )
             ''')
             
@@ -105,415 +450,504 @@ class DatabaseManager:
             )
             ''')
             
-            self.conn.commit()
+            # Databases created before updated_at existed need the column added
+            for table in ('job_descriptions', 'candidates'):
+                self.cursor.execute(f"PRAGMA table_info({table})")
+                if 'updated_at' not in {row['name'] for row in self.cursor.fetchall()}:
+                    self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMP")
+            
+            # Link tables; ones that didn't exist yet are backfilled from the JSON columns already stored
+            self.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            existing = {row['name'] for row in self.cursor.fetchall()}
+            for table, (owner, value, *_) in _LINK_TABLES.items():
+                self.cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    {owner} TEXT NOT NULL,
+                    {value} TEXT NOT NULL COLLATE NOCASE,
+                    PRIMARY KEY ({owner}, {value})
+                ) WITHOUT ROWID
+                ''')
+                self.cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{value} ON {table} ({value}, {owner})")
+                if table not in existing:
+                    self._fill_link_table(self.cursor, table)
+            
+            # Indexes for the job / candidate lookups so they don't scan the whole table
+            for index_sql in _MATCH_INDEXES.values():
+                self.cursor.execute(index_sql)
+            self.cursor.execute(_EMAIL_INDEX_SQL)
         except sqlite3.Error as e:
-            print(f"Error creating tables: {e}")
+            logger.exception("Error creating tables")
+            raise DBError(f"Error creating tables: {e}") from e
+    
+    @staticmethod
+    def _fill_link_table(cursor: sqlite3.Cursor, table: str, ids: Optional[List[str]] = None) -> None:
+        """Copy the list entries of the given owners (all rows when ids is None) into a link table, in SQL"""
+        owner, value, source, column, path = _LINK_TABLES[table]
+        sql = f'''
+        INSERT OR IGNORE INTO {table} ({owner}, {value})
+        SELECT s.{owner}, trim(j.value) FROM {source} s, json_each(s.{column}, '{path}') j
+        WHERE json_valid(s.{column}) AND j.type = 'text' AND trim(j.value) != ''
+        '''
+        if ids is None:
+            cursor.execute(sql)
+            return
+        for start in range(0, len(ids), MAX_IN_PARAMS):
+            chunk = ids[start:start + MAX_IN_PARAMS]
+            cursor.execute(sql + f" AND s.{owner} IN ({', '.join('?' * len(chunk))})", chunk)
+    
+    @staticmethod
+    def _sync_link_tables(cursor: sqlite3.Cursor, source: str, ids: List[str], refill: bool = True) -> None:
+        """Rebuild (or with refill=False just drop) the link rows of the given owners of a source table"""
+        for table, (owner, _, table_source, _, _) in _LINK_TABLES.items():
+            if table_source != source:
+                continue
+            for start in range(0, len(ids), MAX_IN_PARAMS):
+                chunk = ids[start:start + MAX_IN_PARAMS]
+                cursor.execute(f"DELETE FROM {table} WHERE {owner} IN ({', '.join('?' * len(chunk))})", chunk)
+            if refill:
+                DatabaseManager._fill_link_table(cursor, table, ids)
+    
+    def drop_match_indexes(self) -> bool:
+        """Drop the match indexes before a large ingest (recreate them with create_match_indexes)"""
+        try:
+            with self._rw() as cursor:
+                for name in _MATCH_INDEXES:
+                    cursor.execute(f"DROP INDEX IF EXISTS {name}")
+            return True
+        except sqlite3.Error as e:
+            logger.exception("Error dropping match indexes")
+            raise DBError(f"Error dropping match indexes: {e}") from e
+    
+    def create_match_indexes(self) -> bool:
+        """(Re)build the match indexes, e.g. once after a bulk load"""
+        try:
+            with self._rw() as cursor:
+                for index_sql in _MATCH_INDEXES.values():
+                    cursor.execute(index_sql)
+            return True
+        except sqlite3.Error as e:
+            logger.exception("Error creating match indexes")
+            raise DBError(f"Error creating match indexes: {e}") from e
+    
+    def clear_caches(self) -> None:
+        """Drop all cached job and candidate rows"""
+        self._job_cache.invalidate()
+        self._candidate_cache.invalidate()
+    
+    def cache_info(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters and sizes of the job and candidate lookup caches"""
+        return {"jobs": self._job_cache.info(), "candidates": self._candidate_cache.info()}
     
     def close(self):
-        """Close the database connection"""
+        """Close the writer and all pooled reader connections"""
         if self.conn:
             self.conn.close()
+        self._readers.close()
+    
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed statements in one explicit transaction: one commit (and fsync) per batch"""
+        with self._rw() as cursor:
+            self.conn.execute("BEGIN")
+            try:
+                yield cursor
+            except BaseException:
+                self.conn.rollback()
+                raise
+            else:
+                self.conn.commit()
+    
+    def _chunked_multi_insert(self, cursor: sqlite3.Cursor, insert_sql: str, columns: Tuple[str, ...], rows: List[Tuple],
+                              single_sql: str, conflict_sql: str = ""):
+        """Insert rows as multi-VALUES statements sized to the variable limit (call inside a transaction)"""
+        chunk_rows = _MAX_VARIABLES // len(columns)
+        full = len(rows) - len(rows) % chunk_rows
+        if full:
+            placeholder = "(" + ", ".join("?" * len(columns)) + ")"
+            sql = f"{insert_sql} ({', '.join(columns)}) VALUES " + ", ".join([placeholder] * chunk_rows) + conflict_sql
+            for start in range(0, full, chunk_rows):
+                cursor.execute(sql, list(itertools.chain.from_iterable(rows[start:start + chunk_rows])))
+        # The remainder reuses the prepared single-row statement instead of a one-off statement shape
+        if full < len(rows):
+            cursor.executemany(single_sql, rows[full:])
+    
+    # Row builders: positional params with JSON fields serialized, without mutating the caller's dict
+    @staticmethod
+    def _execute(conn: sqlite3.Connection, factory, query: str, params: Tuple = ()) -> sqlite3.Cursor:
+        """Run a query on a cursor whose row factory decodes rows as they are fetched"""
+        cursor = conn.cursor()
+        cursor.row_factory = factory
+        return cursor.execute(query, params)
+    
+    def _iter_rows(self, query: str, params: Tuple = (), factory=_dict_factory) -> Iterator[Dict[str, Any]]:
+        """Stream a query's rows in fetchmany batches on one pooled reader, held until the caller stops"""
+        with self._ro() as conn:
+            cursor = self._execute(conn, factory, query, params)
+            cursor.arraysize = _FETCH_BATCH
+            while batch := cursor.fetchmany():
+                yield from batch
+    
+    @staticmethod
+    def _job_row(job_data: Dict[str, Any], updated_at: datetime.datetime) -> Tuple:
+        return (
+            job_data.get('job_id'),
+            job_data.get('title', ''),
+            job_data.get('company', ''),
+            job_data.get('location', ''),
+            job_data.get('job_type', ''),
+            job_data.get('description', ''),
+            _json_param(job_data.get('responsibilities', '')),
+            _json_param(job_data.get('requirements', '')),
+            job_data.get('salary_range', ''),
+            job_data.get('posting_date', ''),
+            job_data.get('department', ''),
+            updated_at
+        )
+    
+    @staticmethod
+    def _candidate_row(candidate_data: Dict[str, Any], updated_at: datetime.datetime) -> Tuple:
+        return (
+            candidate_data.get('candidate_id'),
+            candidate_data.get('name', ''),
+            candidate_data.get('email', ''),
+            candidate_data.get('phone', ''),
+            candidate_data.get('location', ''),
+            candidate_data.get('linkedin', ''),
+            candidate_data.get('summary', ''),
+            _json_param(candidate_data.get('skills', '')),
+            _json_param(candidate_data.get('experience', '')),
+            _json_param(candidate_data.get('education', '')),
+            _json_param(candidate_data.get('certifications', '')),
+            _json_param(candidate_data.get('languages', '')),
+            candidate_data.get('resume_path', ''),
+            updated_at
+        )
+    
+    @staticmethod
+    def _match_row(match_data: Dict[str, Any]) -> Tuple:
+        return (
+            match_data.get('job_id'),
+            match_data.get('candidate_id'),
+            match_data.get('overall_match_score', 0.0),
+            match_data.get('skill_match_score', 0.0),
+            match_data.get('experience_match_score', 0.0),
+            match_data.get('education_match_score', 0.0),
+            _json_param(match_data.get('match_details', '')),
+            match_data.get('is_shortlisted', 0)
+        )
+    
+    @staticmethod
+    def _email_row(email_data: Dict[str, Any]) -> Tuple:
+        return (
+            email_data.get('candidate_id'),
+            email_data.get('job_id'),
+            email_data.get('email_to', ''),
+            email_data.get('email_type', ''),
+            email_data.get('subject', ''),
+            email_data.get('body', ''),
+            1 if email_data.get('success', False) else 0,
+            email_data.get('message', ''),
+            email_data.get('sent_at')
+        )
     
     # Job Description operations
     def insert_job_description(self, job_data: Dict[str, Any]) -> bool:
         """Insert a job description into the database"""
+        return self.insert_job_descriptions_bulk([job_data])
+    
+    def insert_job_descriptions_bulk(self, jobs: List[Dict[str, Any]]) -> bool:
+        """Insert many job descriptions in a single transaction"""
         try:
-            # Convert list and dict fields to JSON strings
-            if 'responsibilities' in job_data and isinstance(job_data['responsibilities'], list):
-                job_data['responsibilities'] = json.dumps(job_data['responsibilities'])
-            
-            if 'requirements' in job_data:
-                if isinstance(job_data['requirements'], dict):
-                    job_data['requirements'] = json.dumps(job_data['requirements'])
-            
-            query = '''
-            INSERT INTO job_descriptions (
-                job_id, title, company, location, job_type, description, 
-                responsibilities, requirements, salary_range, 
-                posting_date, department
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            '''
-            
-            self.cursor.execute(query, (
-                job_data.get('job_id'),
-                job_data.get('title', ''),
-                job_data.get('company', ''),
-                job_data.get('location', ''),
-                job_data.get('job_type', ''),
-                job_data.get('description', ''),
-                job_data.get('responsibilities', ''),
-                job_data.get('requirements', ''),
-                job_data.get('salary_range', ''),
-                job_data.get('posting_date', ''),
-                job_data.get('department', '')
-            ))
-            
-            self.conn.commit()
+            updated_at = datetime.datetime.now()
+            rows = [self._job_row(job_data, updated_at) for job_data in jobs]
+            with self._transaction() as cursor:
+                cursor.executemany(_INSERT_JOB_SQL, rows)
+                self._sync_link_tables(cursor, "job_descriptions", [row[0] for row in rows])
+            self._job_cache.invalidate([row[0] for row in rows])
             return True
         except sqlite3.Error as e:
-            print(f"Error inserting job description: {e}")
-            return False
+            logger.exception("Error inserting job descriptions")
+            raise DBError(f"Error inserting job descriptions: {e}") from e
     
     def get_job_description(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Get a job description by ID"""
+        """Get a job description by ID (a shallow copy; nested lists/dicts are shared with the cache)"""
+        cached = self._job_cache.get(job_id)
+        if cached is not None:
+            return dict(cached)
+        generation = self._job_cache.generation
         try:
-            query = "SELECT * FROM job_descriptions WHERE job_id = ?"
-            self.cursor.execute(query, (job_id,))
-            row = self.cursor.fetchone()
-            
-            if not row:
-                return None
-            
-            job_dict = dict(row)
-            
-            # Convert JSON strings back to Python objects
-            if job_dict.get('responsibilities'):
-                try:
-                    job_dict['responsibilities'] = json.loads(job_dict['responsibilities'])
-                except json.JSONDecodeError:
-                    job_dict['responsibilities'] = []
-            
-            if job_dict.get('requirements'):
-                try:
-                    job_dict['requirements'] = json.loads(job_dict['requirements'])
-                except json.JSONDecodeError:
-                    job_dict['requirements'] = {}
-            
+            with self._ro() as conn:
+                job_dict = self._execute(conn, _job_factory, _SELECT_JOB_SQL, (job_id,)).fetchone()
+            if job_dict is not None:
+                self._job_cache.put(job_id, job_dict, generation)
+                job_dict = dict(job_dict)
             return job_dict
         except sqlite3.Error as e:
-            print(f"Error getting job description: {e}")
-            return None
+            logger.exception("Error getting job description")
+            raise DBError(f"Error getting job description: {e}") from e
     
     def get_all_job_descriptions(self) -> List[Dict[str, Any]]:
         """Get all job descriptions"""
+        return list(self.iter_job_descriptions())
+    
+    def iter_job_descriptions(self) -> Iterator[Dict[str, Any]]:
+        """Yield job descriptions newest first, decoding each only when the caller reaches it"""
         try:
-            query = "SELECT * FROM job_descriptions ORDER BY created_at DESC"
-            self.cursor.execute(query)
-            rows = self.cursor.fetchall()
-            
-            job_list = []
-            for row in rows:
-                job_dict = dict(row)
-                
-                # Convert JSON strings back to Python objects
-                if job_dict.get('responsibilities'):
-                    try:
-                        job_dict['responsibilities'] = json.loads(job_dict['responsibilities'])
-                    except json.JSONDecodeError:
-                        job_dict['responsibilities'] = []
-                
-                if job_dict.get('requirements'):
-                    try:
-                        job_dict['requirements'] = json.loads(job_dict['requirements'])
-                    except json.JSONDecodeError:
-                        job_dict['requirements'] = {}
-                
-                job_list.append(job_dict)
-            
-            return job_list
+            yield from self._iter_rows(_SELECT_ALL_JOBS_SQL, factory=_job_factory)
         except sqlite3.Error as e:
-            print(f"Error getting all job descriptions: {e}")
-            return []
+            logger.exception("Error getting all job descriptions")
+            raise DBError(f"Error getting all job descriptions: {e}") from e
     
     def delete_job_description(self, job_id: str) -> bool:
         """Delete a job description by ID"""
         try:
-            query = "DELETE FROM job_descriptions WHERE job_id = ?"
-            self.cursor.execute(query, (job_id,))
-            self.conn.commit()
-            return self.cursor.rowcount > 0  # True if something was deleted
+            with self._transaction() as cursor:
+                cursor.execute(_DELETE_JOB_SQL, (job_id,))
+                deleted = cursor.rowcount > 0  # True if something was deleted
+                self._sync_link_tables(cursor, "job_descriptions", [job_id], refill=False)
+            self._job_cache.invalidate([job_id])
+            return deleted
         except sqlite3.Error as e:
-            print(f"Error deleting job description: {e}")
-            return False
+            logger.exception("Error deleting job description")
+            raise DBError(f"Error deleting job description: {e}") from e
     # Candidate operations
     def insert_candidate(self, candidate_data: Dict[str, Any]) -> bool:
         """Insert a candidate into the database"""
+        return self.insert_candidates_bulk([candidate_data])
+    
+    def insert_candidates_bulk(self, candidates: List[Dict[str, Any]]) -> bool:
+        """Insert many candidates in a single transaction, updating any that already exist"""
         try:
-            # Convert list and dict fields to JSON strings
-            if 'skills' in candidate_data and isinstance(candidate_data['skills'], list):
-                candidate_data['skills'] = json.dumps(candidate_data['skills'])
-            
-            if 'experience' in candidate_data and isinstance(candidate_data['experience'], list):
-                candidate_data['experience'] = json.dumps(candidate_data['experience'])
-            
-            if 'education' in candidate_data and isinstance(candidate_data['education'], list):
-                candidate_data['education'] = json.dumps(candidate_data['education'])
-            
-            if 'certifications' in candidate_data and isinstance(candidate_data['certifications'], list):
-                candidate_data['certifications'] = json.dumps(candidate_data['certifications'])
-            
-            if 'languages' in candidate_data and isinstance(candidate_data['languages'], list):
-                candidate_data['languages'] = json.dumps(candidate_data['languages'])
-            
-            query = '''
-            INSERT INTO candidates (
-                candidate_id, name, email, phone, location, linkedin, summary,
-                skills, experience, education, certifications, languages, resume_path
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            '''
-            
-            self.cursor.execute(query, (
-                candidate_data.get('candidate_id'),
-                candidate_data.get('name', ''),
-                candidate_data.get('email', ''),
-                candidate_data.get('phone', ''),
-                candidate_data.get('location', ''),
-                candidate_data.get('linkedin', ''),
-                candidate_data.get('summary', ''),
-                candidate_data.get('skills', ''),
-                candidate_data.get('experience', ''),
-                candidate_data.get('education', ''),
-                candidate_data.get('certifications', ''),
-                candidate_data.get('languages', ''),
-                candidate_data.get('resume_path', '')
-            ))
-            
-            self.conn.commit()
+            updated_at = datetime.datetime.now()
+            rows = [self._candidate_row(candidate_data, updated_at) for candidate_data in candidates]
+            with self._transaction() as cursor:
+                self._chunked_multi_insert(cursor, "INSERT INTO candidates", _CANDIDATE_COLUMNS, rows,
+                                           _INSERT_CANDIDATE_SQL, _CANDIDATE_UPSERT_CLAUSE)
+                self._sync_link_tables(cursor, "candidates", [row[0] for row in rows])
+            self._candidate_cache.invalidate([row[0] for row in rows])
             return True
         except sqlite3.Error as e:
-            print(f"Error inserting candidate: {e}")
-            return False
+            logger.exception("Error inserting candidates")
+            raise DBError(f"Error inserting candidates: {e}") from e
     
     def get_candidate(self, candidate_id: str) -> Optional[Dict[str, Any]]:
-        """Get a candidate by ID"""
+        """Get a candidate by ID (a shallow copy; nested lists/dicts are shared with the cache)"""
+        cached = self._candidate_cache.get(candidate_id)
+        if cached is not None:
+            return dict(cached)
+        generation = self._candidate_cache.generation
         try:
-            query = "SELECT * FROM candidates WHERE candidate_id = ?"
-            self.cursor.execute(query, (candidate_id,))
-            row = self.cursor.fetchone()
-            
-            if not row:
-                return None
-            
-            candidate_dict = dict(row)
-            
-            # Convert JSON strings back to Python objects
-            for field in ['skills', 'experience', 'education', 'certifications', 'languages']:
-                if candidate_dict.get(field):
-                    try:
-                        candidate_dict[field] = json.loads(candidate_dict[field])
-                    except json.JSONDecodeError:
-                        candidate_dict[field] = []
-            
+            with self._ro() as conn:
+                candidate_dict = self._execute(conn, _candidate_factory, _SELECT_CANDIDATE_SQL, (candidate_id,)).fetchone()
+            if candidate_dict is not None:
+                self._candidate_cache.put(candidate_id, candidate_dict, generation)
+                candidate_dict = dict(candidate_dict)
             return candidate_dict
         except sqlite3.Error as e:
-            print(f"Error getting candidate: {e}")
-            return None
+            logger.exception("Error getting candidate")
+            raise DBError(f"Error getting candidate: {e}") from e
     
-    def get_all_candidates(self) -> List[Dict[str, Any]]:
-        """Get all candidates"""
+    def get_candidates(self, candidate_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get several candidates by ID in bulk (all candidates if no IDs are given)"""
+        if candidate_ids is None:
+            return self.get_all_candidates()
         try:
-            query = "SELECT * FROM candidates ORDER BY created_at DESC"
-            self.cursor.execute(query)
-            rows = self.cursor.fetchall()
-            
-            candidate_list = []
-            for row in rows:
-                candidate_dict = dict(row)
-                
-                # Convert JSON strings back to Python objects
-                for field in ['skills', 'experience', 'education', 'certifications', 'languages']:
-                    if candidate_dict.get(field):
-                        try:
-                            candidate_dict[field] = json.loads(candidate_dict[field])
-                        except json.JSONDecodeError:
-                            candidate_dict[field] = []
-                
-                candidate_list.append(candidate_dict)
-            
-            return candidate_list
+            ids = list(dict.fromkeys(candidate_ids))
+            by_id = {}
+            with self._ro() as conn:
+                # One IN (...) query per chunk instead of one SELECT per candidate
+                for start in range(0, len(ids), MAX_IN_PARAMS):
+                    chunk = ids[start:start + MAX_IN_PARAMS]
+                    placeholders = ", ".join("?" * len(chunk))
+                    query = f"SELECT * FROM candidates WHERE candidate_id IN ({placeholders})"
+                    for candidate_dict in self._execute(conn, _candidate_factory, query, chunk):
+                        by_id[candidate_dict['candidate_id']] = candidate_dict
+            
+            # Keep the caller's order and silently drop unknown IDs
+            return [by_id[cid] for cid in ids if cid in by_id]
+        except sqlite3.Error as e:
+            logger.exception("Error getting candidates")
+            raise DBError(f"Error getting candidates: {e}") from e
+    
+    def get_all_candidates(self, columns: Optional[List[str]] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get all candidates, optionally only some columns and at most `limit` rows (newest first)"""
+        return list(self.iter_candidates(columns, limit))
+    
+    def iter_candidates(self, columns: Optional[List[str]] = None, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield candidates newest first without materializing the whole table"""
+        try:
+            projection = ", ".join(columns) if columns else "*"
+            query = f"SELECT {projection} FROM candidates ORDER BY created_at DESC"
+            params = ()
+            if limit is not None:
+                query += " LIMIT ?"
+                params = (limit,)
+            yield from self._iter_rows(query, params, factory=_candidate_factory)
         except sqlite3.Error as e:
-            print(f"Error getting all candidates: {e}")
-            return []
+            logger.exception("Error getting all candidates")
+            raise DBError(f"Error getting all candidates: {e}") from e
     def delete_candidate(self, candidate_id: str) -> bool:
         """Delete a candidate by ID"""
         try:
-            query = "DELETE FROM candidates WHERE candidate_id = ?"
-            self.cursor.execute(query, (candidate_id,))
-            self.conn.commit()
+            with self._transaction() as cursor:
+                cursor.execute(_DELETE_CANDIDATE_SQL, (candidate_id,))
+                self._sync_link_tables(cursor, "candidates", [candidate_id], refill=False)
+            self._candidate_cache.invalidate([candidate_id])
             return True
         except sqlite3.Error as e:
-            print(f"Error deleting candidate: {e}")
-            return False
+            logger.exception("Error deleting candidate")
+            raise DBError(f"Error deleting candidate: {e}") from e
         
     # Match operations
     def insert_match(self, match_data: Dict[str, Any]) -> bool:
         """Insert a match result into the database"""
+        return self.insert_matches_bulk([match_data])
+    
+    def insert_matches_bulk(self, matches: List[Dict[str, Any]]) -> bool:
+        """Insert many match results in a single transaction"""
         try:
-            # Convert match details to JSON string
-            if 'match_details' in match_data and isinstance(match_data['match_details'], dict):
-                match_data['match_details'] = json.dumps(match_data['match_details'])
-            
-            query = '''
-            INSERT OR REPLACE INTO matches (
-                job_id, candidate_id, overall_match_score, 
-                skill_match_score, experience_match_score, education_match_score,
-                match_details, is_shortlisted
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            '''
-            
-            self.cursor.execute(query, (
-                match_data.get('job_id'),
-                match_data.get('candidate_id'),
-                match_data.get('overall_match_score', 0.0),
-                match_data.get('skill_match_score', 0.0),
-                match_data.get('experience_match_score', 0.0),
-                match_data.get('education_match_score', 0.0),
-                match_data.get('match_details', ''),
-                match_data.get('is_shortlisted', 0)
-            ))
-            
-            self.conn.commit()
+            rows = [self._match_row(match_data) for match_data in matches]
+            with self._transaction() as cursor:
+                self._chunked_multi_insert(cursor, "INSERT INTO matches", _MATCH_COLUMNS, rows,
+                                           _INSERT_MATCH_SQL, _MATCH_UPSERT_CLAUSE)
             return True
         except sqlite3.Error as e:
-            print(f"Error inserting match: {e}")
-            return False
+            logger.exception("Error inserting matches")
+            raise DBError(f"Error inserting matches: {e}") from e
     
     def update_shortlist_status(self, job_id: str, candidate_id: str, is_shortlisted: bool) -> bool:
         """Update the shortlist status of a match"""
+        return self.update_shortlist_status_bulk(job_id, [candidate_id], is_shortlisted)
+    
+    @staticmethod
+    def _set_shortlist_flag(cursor: sqlite3.Cursor, job_id: str, candidate_ids: List[str], flag: int) -> None:
+        """One UPDATE per chunk of IDs rather than one per candidate"""
+        for start in range(0, len(candidate_ids), MAX_IN_PARAMS):
+            chunk = candidate_ids[start:start + MAX_IN_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            query = f"UPDATE matches SET is_shortlisted = ? WHERE job_id = ? AND candidate_id IN ({placeholders})"
+            cursor.execute(query, (flag, job_id, *chunk))
+    
+    def update_shortlist_status_bulk(self, job_id: str, candidate_ids: List[str], is_shortlisted: bool) -> bool:
+        """Set the same shortlist status on many of a job's matches in a single transaction"""
         try:
-            query = '''
-            UPDATE matches 
-            SET is_shortlisted = ? 
-            WHERE job_id = ? AND candidate_id = ?
-            '''
-            
-            self.cursor.execute(query, (
-                1 if is_shortlisted else 0,
-                job_id,
-                candidate_id
-            ))
-            
-            self.conn.commit()
+            with self._transaction() as cursor:
+                self._set_shortlist_flag(cursor, job_id, candidate_ids, 1 if is_shortlisted else 0)
             return True
         except sqlite3.Error as e:
-            print(f"Error updating shortlist status: {e}")
-            return False
+            logger.exception("Error updating shortlist status")
+            raise DBError(f"Error updating shortlist status: {e}") from e
     
-    def get_matches_for_job(self, job_id: str) -> List[Dict[str, Any]]:
+    def bulk_update_shortlist_status(self, job_id: str, shortlisted_ids: List[str], rejected_ids: List[str]) -> bool:
+        """Mark some matches shortlisted and others rejected in a single transaction"""
+        try:
+            with self._transaction() as cursor:
+                self._set_shortlist_flag(cursor, job_id, shortlisted_ids, 1)
+                self._set_shortlist_flag(cursor, job_id, rejected_ids, 0)
+            return True
+        except sqlite3.Error as e:
+            logger.exception("Error bulk updating shortlist status")
+            raise DBError(f"Error bulk updating shortlist status: {e}") from e
+    
+    def get_matches_for_job(self, job_id: str, details: bool = False) -> List[Dict[str, Any]]:
         """Get all matches for a specific job"""
+        return list(self.iter_matches_for_job(job_id, details))
+    
+    def iter_matches_for_job(self, job_id: str, details: bool = False) -> Iterator[Dict[str, Any]]:
+        """Yield a job's matches best score first (scores and candidate name/email; match_details too if asked)"""
+        try:
+            if details:
+                yield from self._iter_rows(_SELECT_MATCHES_WITH_DETAILS_FOR_JOB_SQL, (job_id,), factory=_match_factory)
+            else:
+                yield from self._iter_rows(_SELECT_MATCHES_FOR_JOB_SQL, (job_id,), factory=_match_list_factory)
+        except sqlite3.Error as e:
+            logger.exception("Error getting matches for job")
+            raise DBError(f"Error getting matches for job: {e}") from e
+    
+    def get_match_details(self, job_id: str, candidate_id: str) -> Optional[Dict[str, Any]]:
+        """Get the match_details breakdown of a single match (None if there is no such match)"""
         try:
-            query = """
-            SELECT m.*, c.name as candidate_name, c.email as candidate_email 
-            FROM matches m
-            JOIN candidates c ON m.candidate_id = c.candidate_id
-            WHERE m.job_id = ?
-            ORDER BY m.overall_match_score DESC
-            """
-            self.cursor.execute(query, (job_id,))
-            rows = self.cursor.fetchall()
+            with self._ro() as conn:
+                row = self._execute(conn, _match_factory, _SELECT_MATCH_DETAILS_SQL, (job_id, candidate_id)).fetchone()
             
-            match_list = []
-            for row in rows:
-                match_dict = dict(row)
-                
-                # Convert match details from JSON string to dict
-                if match_dict.get('match_details'):
-                    try:
-                        match_dict['match_details'] = json.loads(match_dict['match_details'])
-                    except json.JSONDecodeError:
-                        match_dict['match_details'] = {}
-                
-                match_list.append(match_dict)
+            if not row:
+                return None
             
-            return match_list
+            return row['match_details'] or {}
         except sqlite3.Error as e:
-            print(f"Error getting matches for job: {e}")
-            return []
+            logger.exception("Error getting match details")
+            raise DBError(f"Error getting match details: {e}") from e
+    
+    def get_match_scores_for_job(self, job_id: str) -> List[Dict[str, Any]]:
+        """Get just the candidate IDs and scores of a job's matches (no details, no candidate columns)"""
+        try:
+            with self._ro() as conn:
+                return self._execute(conn, _match_score_factory, _SELECT_MATCH_SCORES_SQL, (job_id,)).fetchall()
+        except sqlite3.Error as e:
+            logger.exception("Error getting match scores for job")
+            raise DBError(f"Error getting match scores for job: {e}") from e
     
     def get_shortlisted_candidates(self, job_id: str) -> List[Dict[str, Any]]:
-        """Get all shortlisted candidates for a specific job"""
+        """Get the shortlisted candidates of a job (contact details, skills and scores)"""
         try:
-            query = """
-            SELECT c.*, m.overall_match_score, m.skill_match_score, 
-                   m.experience_match_score, m.education_match_score
-            FROM matches m
-            JOIN candidates c ON m.candidate_id = c.candidate_id
-            WHERE m.job_id = ? AND m.is_shortlisted = 1
-            ORDER BY m.overall_match_score DESC
-            """
-            self.cursor.execute(query, (job_id,))
-            rows = self.cursor.fetchall()
-            
-            candidate_list = []
-            for row in rows:
-                candidate_dict = dict(row)
-                
-                # Convert JSON strings back to Python objects
-                for field in ['skills', 'experience', 'education', 'certifications', 'languages']:
-                    if candidate_dict.get(field):
-                        try:
-                            candidate_dict[field] = json.loads(candidate_dict[field])
-                        except json.JSONDecodeError:
-                            candidate_dict[field] = []
-                
-                candidate_list.append(candidate_dict)
-            
-            return candidate_list
+            with self._ro() as conn:
+                return self._execute(conn, _candidate_factory, _SELECT_SHORTLISTED_SQL, (job_id,)).fetchall()
+        except sqlite3.Error as e:
+            logger.exception("Error getting shortlisted candidates")
+            raise DBError(f"Error getting shortlisted candidates: {e}") from e
+    
+    def get_shortlisted_summary(self, job_id: str) -> List[Dict[str, Any]]:
+        """Get a compact shortlist for a job: candidate name/email, skill count and overall score"""
+        try:
+            with self._ro() as conn:
+                return self._execute(conn, _shortlist_summary_factory, _SELECT_SHORTLIST_SUMMARY_SQL, (job_id,)).fetchall()
         except sqlite3.Error as e:
-            print(f"Error getting shortlisted candidates: {e}")
-            return []
+            logger.exception("Error getting shortlist summary")
+            raise DBError(f"Error getting shortlist summary: {e}") from e
+    
+    def get_candidate_skill_matches(self, job_id: str) -> List[Dict[str, Any]]:
+        """Candidates sharing at least one required skill with a job, with the number of exact skill hits"""
+        try:
+            with self._ro() as conn:
+                return self._execute(conn, _skill_match_factory, _SELECT_SKILL_MATCHES_SQL, (job_id,)).fetchall()
+        except sqlite3.Error as e:
+            logger.exception("Error getting candidate skill matches")
+            raise DBError(f"Error getting candidate skill matches: {e}") from e
     
     # Email operations
     def insert_email(self, email_data: Dict[str, Any]) -> bool:
         """Insert an email record into the database"""
+        return self.insert_emails_bulk([email_data])
+    
+    def insert_emails_bulk(self, emails: List[Dict[str, Any]]) -> bool:
+        """Insert many email records in a single transaction"""
         try:
-            query = '''
-            INSERT INTO emails (
-                candidate_id, job_id, email_to, email_type,
-                subject, body, success, message, sent_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            '''
-            
-            sent_at = email_data.get('sent_at')
-            if sent_at and not isinstance(sent_at, str):
-                sent_at = sent_at.isoformat()
-            
-            self.cursor.execute(query, (
-                email_data.get('candidate_id'),
-                email_data.get('job_id'),
-                email_data.get('email_to', ''),
-                email_data.get('email_type', ''),
-                email_data.get('subject', ''),
-                email_data.get('body', ''),
-                1 if email_data.get('success', False) else 0,
-                email_data.get('message', ''),
-                sent_at
-            ))
-            
-            self.conn.commit()
+            rows = [self._email_row(email_data) for email_data in emails]
+            with self._transaction() as cursor:
+                cursor.executemany(_INSERT_EMAIL_SQL, rows)
             return True
         except sqlite3.Error as e:
-            print(f"Error inserting email: {e}")
-            return False
+            logger.exception("Error inserting emails")
+            raise DBError(f"Error inserting emails: {e}") from e
     
     def get_emails_for_candidate(self, candidate_id: str, job_id: str = None) -> List[Dict[str, Any]]:
         """Get all emails sent to a specific candidate"""
         try:
-            if job_id:
-                query = """
-                SELECT * FROM emails 
-                WHERE candidate_id = ? AND job_id = ?
-                ORDER BY created_at DESC
-                """
-                self.cursor.execute(query, (candidate_id, job_id))
-            else:
-                query = """
-                SELECT * FROM emails 
-                WHERE candidate_id = ?
-                ORDER BY created_at DESC
-                """
-                self.cursor.execute(query, (candidate_id,))
-                
-            rows = self.cursor.fetchall()
-            return [dict(row) for row in rows]
+            with self._ro() as conn:
+                if job_id:
+                    return self._execute(conn, _email_factory, _SELECT_EMAILS_FOR_CANDIDATE_JOB_SQL, (candidate_id, job_id)).fetchall()
+                return self._execute(conn, _email_factory, _SELECT_EMAILS_FOR_CANDIDATE_SQL, (candidate_id,)).fetchall()
         except sqlite3.Error as e:
-            print(f"Error getting emails for candidate: {e}")
-            return []
+            logger.exception("Error getting emails for candidate")
+            raise DBError(f"Error getting emails for candidate: {e}") from e
     def clean_null_job_ids(self):
         """Delete job entries where job_id is null or empty"""
         try:
-            self.cursor.execute("DELETE FROM job_descriptions WHERE job_id IS NULL OR TRIM(job_id) = ''")
-            self.conn.commit()
-            print("✅ Null or empty job_id rows deleted.")
+            with self._transaction() as cursor:
+                cursor.execute(_DELETE_NULL_JOBS_SQL)
+                cursor.execute("DELETE FROM job_required_skills WHERE TRIM(job_id) = ''")
+            self._job_cache.invalidate()
+            logger.info("Null or empty job_id rows deleted")
         except sqlite3.Error as e:
-            print(f"Error cleaning null job_ids: {e}")
\ No newline at end of file
+            logger.exception("Error cleaning null job_ids")
+            raise DBError(f"Error cleaning null job_ids: {e}") from e
\ No newline at end of file
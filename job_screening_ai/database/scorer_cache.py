@@ -0,0 +1,237 @@
+# job_screening_ai/database/scorer_cache.py
+
+import sqlite3
+import orjson
+import hashlib
+import logging
+import importlib.util
+import numpy as np
+from collections import OrderedDict
+from typing import List, Dict, Any, Tuple
+
+from ._sqlite import MAX_IN_PARAMS, apply_pragmas, json_dumps, json_loads
+
+logger = logging.getLogger(__name__)
+
+class ScorerCache:
+    """Persistent cache of match scores keyed by job, candidate and their content hashes"""
+
+    def __init__(self, db_path: str = "job_screening.db", memory_size: int = 100_000):
+        """Open the cache database and create the cache table if it doesn't exist"""
+        self.db_path = db_path
+        self.conn = None
+        self.cursor = None
+        # In-process LRU in front of SQLite: (job_id, candidate_id) -> (job_hash, resume_hash, score)
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[str, str, Dict[str, Any]]]" = OrderedDict()
+        self._connect()
+        self._create_table()
+
+    def _connect(self):
+        """Connect to the SQLite database"""
+        try:
+            self.conn = sqlite3.connect(self.db_path)
+            apply_pragmas(self.conn)
+            self.cursor = self.conn.cursor()
+        except sqlite3.Error as e:
+            logger.warning("Score cache connection error: %s", e)
+
+    def _create_table(self):
+        """Create the match_cache table if it doesn't exist"""
+        try:
+            # One row per (job, candidate); the hashes say which versions the score was computed for
+            self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS match_cache (
+                job_id TEXT NOT NULL,
+                candidate_id TEXT NOT NULL,
+                job_hash TEXT NOT NULL,
+                resume_hash TEXT NOT NULL,
+                score_json TEXT NOT NULL,
+                PRIMARY KEY (job_id, candidate_id)
+            )
+            ''')
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("Error creating score cache table: %s", e)
+
+    def close(self):
+        """Close the database connection"""
+        if self.conn:
+            self.conn.close()
+
+    @staticmethod
+    def fingerprint(content: str) -> str:
+        """Short content hash of a serialized job or candidate"""
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _remember(self, job_id: str, candidate_id: str, job_hash: str, resume_hash: str, score: Dict[str, Any]) -> None:
+        """Put an entry in the in-memory LRU, evicting the least recently used one when full"""
+        key = (job_id, candidate_id)
+        self._memory[key] = (job_hash, resume_hash, score)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, job_id: str, job_hash: str, resume_hashes: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Cached match dicts by candidate ID, for entries whose job and resume hashes still match"""
+        hits = {}
+        ids = []
+        for candidate_id, resume_hash in resume_hashes.items():
+            entry = self._memory.get((job_id, candidate_id))
+            if entry is not None and entry[0] == job_hash and entry[1] == resume_hash:
+                self._memory.move_to_end((job_id, candidate_id))
+                hits[candidate_id] = entry[2]
+            else:
+                ids.append(candidate_id)
+        
+        # Only what the memory layer missed goes to SQLite
+        try:
+            for start in range(0, len(ids), MAX_IN_PARAMS):
+                chunk = ids[start:start + MAX_IN_PARAMS]
+                placeholders = ", ".join("?" * len(chunk))
+                query = f'''
+                SELECT candidate_id, resume_hash, score_json FROM match_cache
+                WHERE job_id = ? AND job_hash = ? AND candidate_id IN ({placeholders})
+                '''
+                self.cursor.execute(query, (job_id, job_hash, *chunk))
+                for candidate_id, resume_hash, score_json in self.cursor.fetchall():
+                    # A changed resume means a stale score; treat it as a miss
+                    if resume_hash == resume_hashes[candidate_id]:
+                        hits[candidate_id] = json_loads(score_json)
+                        self._remember(job_id, candidate_id, job_hash, resume_hash, hits[candidate_id])
+            return hits
+        except (sqlite3.Error, orjson.JSONDecodeError) as e:
+            logger.warning("Error reading score cache: %s", e)
+            return hits
+
+    def put_many(self, job_id: str, job_hash: str, entries: List[Tuple[str, str, Dict[str, Any]]]) -> bool:
+        """Store (candidate_id, resume_hash, match dict) entries, replacing stale scores"""
+        for candidate_id, resume_hash, score in entries:
+            self._remember(job_id, candidate_id, job_hash, resume_hash, score)
+        try:
+            query = '''
+            INSERT OR REPLACE INTO match_cache (
+                job_id, candidate_id, job_hash, resume_hash, score_json
+            ) VALUES (?, ?, ?, ?, ?)
+            '''
+            self.cursor.executemany(query, [
+                (job_id, candidate_id, job_hash, resume_hash, json_dumps(score))
+                for candidate_id, resume_hash, score in entries
+            ])
+            self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logger.warning("Error writing score cache: %s", e)
+            return False
+
+class DenseScorerCache:
+    """Overall match scores for every job x candidate pair, as a float32 [n_jobs, n_candidates] matrix in an
+    HDF5 file (requires h5py); for exhaustive scans where a per-pair SQLite lookup is the bottleneck"""
+
+    def __init__(self, path: str = "match_scores.h5", chunk_candidates: int = 1024):
+        """Open (or create) the HDF5 file and load the job / candidate ID indexes"""
+        if importlib.util.find_spec("h5py") is None:
+            raise ImportError("DenseScorerCache requires the h5py package")
+        import h5py
+
+        self.path = path
+        self._file = h5py.File(path, "a")
+        # Row and column labels plus the content hash each row / column was scored against
+        for name in ("job_ids", "job_hashes", "candidate_ids", "resume_hashes"):
+            if name not in self._file:
+                self._file.create_dataset(name, shape=(0,), maxshape=(None,), dtype=h5py.string_dtype(),
+                                          chunks=(chunk_candidates,))
+        # Unscored pairs (including rows / columns added by a resize) read back as NaN
+        if "scores" not in self._file:
+            self._file.create_dataset("scores", shape=(0, 0), maxshape=(None, None), dtype=np.float32,
+                                      chunks=(1, chunk_candidates), fillvalue=np.nan)
+        self._job_ids = list(self._file["job_ids"].asstr()[:])
+        self._job_hashes = list(self._file["job_hashes"].asstr()[:])
+        self._candidate_ids = list(self._file["candidate_ids"].asstr()[:])
+        self._resume_hashes = list(self._file["resume_hashes"].asstr()[:])
+        self._job_index = {job_id: i for i, job_id in enumerate(self._job_ids)}
+        self._candidate_index = {candidate_id: j for j, candidate_id in enumerate(self._candidate_ids)}
+
+    def close(self):
+        """Flush and close the HDF5 file"""
+        self._file.close()
+
+    def _append_labels(self, ids_name: str, hashes_name: str, ids: List[str], hashes: List[str]) -> None:
+        """Append new row / column labels and their hashes to the file in one resize"""
+        for name, values in ((ids_name, ids), (hashes_name, hashes)):
+            dataset = self._file[name]
+            start = dataset.shape[0]
+            dataset.resize((start + len(values),))
+            dataset[start:] = values
+
+    def _job_row(self, job_id: str, job_hash: str) -> int:
+        """Row of a job, appended if new; a row scored against an older job hash is cleared"""
+        scores = self._file["scores"]
+        i = self._job_index.get(job_id)
+        if i is None:
+            i = len(self._job_ids)
+            self._job_index[job_id] = i
+            self._job_ids.append(job_id)
+            self._job_hashes.append(job_hash)
+            self._append_labels("job_ids", "job_hashes", [job_id], [job_hash])
+            scores.resize((i + 1, scores.shape[1]))
+        elif self._job_hashes[i] != job_hash:
+            self._job_hashes[i] = job_hash
+            self._file["job_hashes"][i] = job_hash
+            scores[i, :] = np.nan
+        return i
+
+    def _candidate_columns(self, resume_hashes: Dict[str, str]) -> List[int]:
+        """Columns of the given candidates, appending new ones; columns scored against an older resume are cleared"""
+        scores = self._file["scores"]
+        new_ids, new_hashes, columns = [], [], []
+        for candidate_id, resume_hash in resume_hashes.items():
+            j = self._candidate_index.get(candidate_id)
+            if j is None:
+                j = len(self._candidate_ids)
+                self._candidate_index[candidate_id] = j
+                self._candidate_ids.append(candidate_id)
+                self._resume_hashes.append(resume_hash)
+                new_ids.append(candidate_id)
+                new_hashes.append(resume_hash)
+            elif self._resume_hashes[j] != resume_hash:
+                self._resume_hashes[j] = resume_hash
+                self._file["resume_hashes"][j] = resume_hash
+                scores[:, j] = np.nan
+            columns.append(j)
+        if new_ids:
+            self._append_labels("candidate_ids", "resume_hashes", new_ids, new_hashes)
+            scores.resize((scores.shape[0], len(self._candidate_ids)))
+        return columns
+
+    def get_many(self, job_id: str, job_hash: str, resume_hashes: Dict[str, str]) -> Dict[str, float]:
+        """Cached overall scores by candidate ID, for pairs whose job and resume hashes still match"""
+        i = self._job_index.get(job_id)
+        if i is None or self._job_hashes[i] != job_hash or not self._candidate_ids:
+            return {}
+        row = self._file["scores"][i, :]
+        hits = {}
+        for candidate_id, resume_hash in resume_hashes.items():
+            j = self._candidate_index.get(candidate_id)
+            if j is not None and self._resume_hashes[j] == resume_hash and not np.isnan(row[j]):
+                hits[candidate_id] = float(row[j])
+        return hits
+
+    def put_many(self, job_id: str, job_hash: str, entries: List[Tuple[str, str, float]]) -> None:
+        """Store (candidate_id, resume_hash, overall score) entries for one job"""
+        if not entries:
+            return
+        i = self._job_row(job_id, job_hash)
+        # Keyed by candidate so a repeated ID keeps its last score; both dicts share the same key order
+        hashes = {candidate_id: resume_hash for candidate_id, resume_hash, _ in entries}
+        values = {candidate_id: score for candidate_id, _, score in entries}
+        columns = self._candidate_columns(hashes)
+        # Read-modify-write the whole row: one contiguous write instead of scattered per-pair ones
+        row = self._file["scores"][i, :]
+        row[columns] = list(values.values())
+        self._file["scores"][i, :] = row
+
+    def matrix(self) -> Tuple[List[str], List[str], np.ndarray]:
+        """(job IDs, candidate IDs, scores) with the full float32 matrix loaded; NaN where a pair is unscored"""
+        return list(self._job_ids), list(self._candidate_ids), self._file["scores"][:]
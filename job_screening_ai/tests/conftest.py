@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the packages the same way api/main.py does, from the job_screening_ai directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
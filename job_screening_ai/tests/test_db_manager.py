@@ -0,0 +1,120 @@
+import sqlite3
+
+import pytest
+
+from database import DatabaseManager, DBError
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "test.db"))
+    yield db
+    db.close()
+
+
+def _candidate(candidate_id="C-1", **fields):
+    data = {"candidate_id": candidate_id, "name": "Ada", "email": "ada@example.com",
+            "skills": ["Python", "SQL"], "languages": ["English"]}
+    data.update(fields)
+    return data
+
+
+def _job(job_id="JD-1", required=("Python", "Docker")):
+    return {"job_id": job_id, "title": "Dev", "company": "ACME",
+            "requirements": {"required_skills": list(required), "preferred_skills": []}}
+
+
+def _match(candidate_id, score, job_id="JD-1"):
+    return {"job_id": job_id, "candidate_id": candidate_id, "overall_match_score": score,
+            "skill_match_score": score, "experience_match_score": score, "education_match_score": score,
+            "match_details": {"matched_skills": ["Python"]}}
+
+
+def test_duplicate_candidate_updates_existing_row(db):
+    assert db.insert_candidate(_candidate())
+    assert db.get_candidate("C-1")["skills"] == ["Python", "SQL"]
+    # Same resume uploaded again (stable content-derived ID): no IntegrityError, the row is refreshed
+    assert db.insert_candidate(_candidate(name="Ada L.", skills=["Go"]))
+    candidate = db.get_candidate("C-1")
+    assert candidate["name"] == "Ada L." and candidate["skills"] == ["Go"]
+    assert len(db.get_all_candidates()) == 1
+
+
+def test_duplicate_candidates_in_one_bulk_insert(db):
+    assert db.insert_candidates_bulk([_candidate(), _candidate(skills=["Rust"])])
+    assert db.get_candidate("C-1")["skills"] == ["Rust"]
+
+
+def test_bulk_candidates_beyond_one_multi_values_chunk(db):
+    candidates = [_candidate(f"C-{i}") for i in range(200)]
+    assert db.insert_candidates_bulk(candidates)
+    assert db.insert_candidates_bulk(candidates)
+    assert len(db.get_all_candidates()) == 200
+
+
+def test_duplicate_job_raises_dberror(db):
+    assert db.insert_job_description(_job())
+    with pytest.raises(DBError) as excinfo:
+        db.insert_job_description(_job())
+    assert isinstance(excinfo.value.__cause__, sqlite3.IntegrityError)
+
+
+def test_match_upsert_keeps_match_id(db):
+    db.insert_job_description(_job())
+    db.insert_candidate(_candidate())
+    db.insert_match(_match("C-1", 40.0))
+    first = db.get_matches_for_job("JD-1")[0]
+    db.insert_matches_bulk([_match("C-1", 90.0)])
+    matches = db.get_matches_for_job("JD-1")
+    assert len(matches) == 1
+    assert matches[0]["match_id"] == first["match_id"]
+    assert matches[0]["overall_match_score"] == 90.0
+
+
+def test_matches_details_opt_in(db):
+    db.insert_job_description(_job())
+    db.insert_candidate(_candidate())
+    db.insert_match(_match("C-1", 40.0))
+    assert "match_details" not in db.get_matches_for_job("JD-1")[0]
+    assert db.get_matches_for_job("JD-1", details=True)[0]["match_details"] == {"matched_skills": ["Python"]}
+
+
+def test_skill_matches_follow_candidate_updates(db):
+    db.insert_job_description(_job(required=("python", "Docker")))
+    db.insert_candidates_bulk([_candidate("C-1"), _candidate("C-2", skills=["docker", "Python"]),
+                               _candidate("C-3", skills=["Java"])])
+    assert db.get_candidate_skill_matches("JD-1") == [
+        {"candidate_id": "C-2", "hits": 2}, {"candidate_id": "C-1", "hits": 1}
+    ]
+    # Re-inserting replaces the link rows, deleting removes them
+    db.insert_candidate(_candidate("C-1", skills=["Java"]))
+    db.delete_candidate("C-2")
+    assert db.get_candidate_skill_matches("JD-1") == []
+
+
+def test_link_tables_backfilled_for_existing_database(tmp_path):
+    path = str(tmp_path / "old.db")
+    db = DatabaseManager(path)
+    db.insert_job_description(_job())
+    db.insert_candidate(_candidate())
+    db.close()
+    # Simulate a database created before the link tables existed
+    conn = sqlite3.connect(path)
+    conn.executescript("DROP TABLE candidate_skills; DROP TABLE candidate_languages; DROP TABLE job_required_skills;")
+    conn.close()
+    
+    db = DatabaseManager(path)
+    assert db.get_candidate_skill_matches("JD-1") == [{"candidate_id": "C-1", "hits": 1}]
+    languages = db.conn.execute("SELECT candidate_id, language FROM candidate_languages").fetchall()
+    assert languages == [{"candidate_id": "C-1", "language": "English"}]
+    db.close()
+
+
+def test_reader_pool_times_out(tmp_path):
+    db = DatabaseManager(str(tmp_path / "test.db"), pool_size=1, pool_timeout=0.05)
+    held = db._readers.acquire()
+    with pytest.raises(DBError):
+        db.get_all_job_descriptions()
+    db._readers.release(held)
+    assert db.get_all_job_descriptions() == []
+    db.close()
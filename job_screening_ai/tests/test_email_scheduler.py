@@ -0,0 +1,258 @@
+import smtplib
+
+from agents.email_scheduler import EmailSchedulerAgent, _SMTPPool
+from agents.jd_parser import JobDescription
+from agents.resume_parser import CandidateProfile
+
+
+class FakeSMTP:
+    """Stands in for a logged-in smtplib.SMTP connection"""
+    
+    def __init__(self, fail: bool = False, refuse: bool = False):
+        self.fail = fail
+        self.refuse = refuse
+        self.sent = []
+        self.sent_messages = []
+        self.closed = False
+    
+    def has_extn(self, name):
+        return False
+    
+    def noop(self):
+        return 250, b"OK"
+    
+    def sendmail(self, from_addr, to_addrs, msg):
+        if self.fail:
+            raise smtplib.SMTPServerDisconnected("connection dropped")
+        if self.refuse:
+            # smtplib RSETs before raising this, so the session stays usable
+            raise smtplib.SMTPRecipientsRefused({addr: (550, b"mailbox unavailable") for addr in to_addrs})
+        self.sent.append(to_addrs)
+        self.sent_messages.append(msg)
+    
+    def send_message(self, msg):
+        self.sendmail(msg["From"], [msg["To"]], msg.as_bytes())
+    
+    def quit(self):
+        self.closed = True
+    
+    def close(self):
+        self.closed = True
+
+
+def _pool(connections, size=1, messages_per_connection=100):
+    def connect():
+        conn = FakeSMTP()
+        connections.append(conn)
+        return conn
+    return _SMTPPool(connect, lambda conn: None, size, messages_per_connection)
+
+
+def test_pool_reuses_healthy_connection():
+    connections = []
+    pool = _pool(connections)
+    for _ in range(3):
+        pool.release(pool.borrow())
+    assert len(connections) == 1
+    assert not connections[0].closed
+
+
+def test_pool_recycles_after_message_limit():
+    connections = []
+    pool = _pool(connections, messages_per_connection=2)
+    for _ in range(3):
+        pool.release(pool.borrow())
+    assert len(connections) == 2
+    assert connections[0].closed and not connections[1].closed
+
+
+def test_pool_replaces_unhealthy_connection():
+    connections = []
+    pool = _pool(connections)
+    first = pool.borrow()
+    pool.release(first, healthy=False)
+    second = pool.borrow()
+    assert first.closed
+    assert second is not first
+
+
+def test_pool_close_closes_idle_connections():
+    connections = []
+    pool = _pool(connections, size=2)
+    a, b = pool.borrow(), pool.borrow()
+    pool.release(a)
+    pool.release(b)
+    pool.close()
+    assert all(conn.closed for conn in connections)
+
+
+def _agent(connections, fail=False, refuse=False):
+    agent = EmailSchedulerAgent(pool_size=1)
+    agent.email_user = "sender@example.com"
+    agent.email_password = "secret"
+    
+    def connect():
+        conn = FakeSMTP(fail=fail, refuse=refuse)
+        connections.append(conn)
+        return conn
+    agent._connect_smtp = connect
+    return agent
+
+
+def _candidates(emails):
+    return [CandidateProfile(candidate_id=f"C-{i}", name=f"N{i}", email=email) for i, email in enumerate(emails)]
+
+
+JOB = JobDescription(job_id="JD-1", title="Dev", company="ACME")
+
+
+def test_batch_sends_over_one_connection():
+    connections = []
+    agent = _agent(connections)
+    results = agent.send_batch_interview_invitations(JOB, _candidates([f"c{i}@example.com" for i in range(5)]))
+    assert all(result.success for result in results)
+    assert len(connections) == 1
+    assert len(connections[0].sent) == 5
+
+
+def test_batch_replaces_connection_after_failed_send():
+    connections = []
+    agent = _agent(connections, fail=True)
+    results = agent.send_batch_interview_invitations(JOB, _candidates([f"c{i}@example.com" for i in range(6)]))
+    assert not any(result.success for result in results)
+    # Each failed exchange closed its connection and the next send reconnected (2 sends before the abort)
+    assert len(connections) == 2
+    assert all(conn.closed for conn in connections)
+
+
+def test_batch_keeps_connection_after_refused_recipient():
+    connections = []
+    agent = _agent(connections, refuse=True)
+    results = agent.send_batch_interview_invitations(JOB, _candidates([f"c{i}@example.com" for i in range(6)]))
+    assert not any(result.success for result in results)
+    # A 550 is a clean refusal, not a broken session: no reconnect
+    assert len(connections) == 1
+
+
+def test_batch_keeps_connection_for_invalid_address():
+    connections = []
+    agent = _agent(connections)
+    results = agent.send_batch_interview_invitations(JOB, _candidates(["not-an-address", "ok@example.com"]))
+    assert [result.success for result in results] == [False, True]
+    assert len(connections) == 1
+
+
+def test_batch_aborts_after_repeated_failures():
+    connections = []
+    agent = _agent(connections, fail=True)
+    results = agent.send_batch_interview_invitations(JOB, _candidates([f"c{i}@example.com" for i in range(9)]))
+    # 9 // BATCH_ABORT_FAILURE_RATIO failures are attempted, the rest are skipped
+    assert len(connections) == 3
+    assert all(result.message.startswith("Failed to send email") for result in results[:3])
+    assert all(result.message == "Batch aborted after repeated send failures" for result in results[3:])
+
+
+class PipeliningSMTP(FakeSMTP):
+    """Advertises PIPELINING and answers getreply() from a script of (code, text) replies"""
+    
+    def __init__(self, replies):
+        super().__init__()
+        self.replies = list(replies)
+        self.writes = []
+        self.rsets = 0
+    
+    def has_extn(self, name):
+        return name == "pipelining"
+    
+    def send(self, data):
+        self.writes.append(data)
+    
+    def getreply(self):
+        return self.replies.pop(0)
+    
+    def rset(self):
+        self.rsets += 1
+        return 250, b"OK"
+
+
+def test_pipelined_send_success():
+    server = PipeliningSMTP([(250, b"OK"), (250, b"OK"), (354, b"go ahead"), (250, b"queued")])
+    agent = EmailSchedulerAgent()
+    
+    assert agent._pipelined_send(server, "from@example.com", "to@example.com", b".hidden\r\nbody") == (
+        True, "Email sent successfully"
+    )
+    # Envelope in one write, then the dot-stuffed payload with its terminator
+    assert server.writes == [
+        b"MAIL FROM:<from@example.com>\r\nRCPT TO:<to@example.com>\r\nDATA\r\n",
+        b"..hidden\r\nbody\r\n.\r\n",
+    ]
+    assert server.rsets == 0 and server.replies == []
+
+
+def test_pipelined_send_refused_recipient_resets():
+    server = PipeliningSMTP([(250, b"OK"), (550, b"mailbox unavailable"), (503, b"no valid recipients")])
+    agent = EmailSchedulerAgent()
+    
+    success, message = agent._pipelined_send(server, "from@example.com", "to@example.com", b"body")
+    
+    assert not success
+    assert message == "Failed to send email: 550 mailbox unavailable"
+    assert len(server.writes) == 1  # no payload after a refusal
+    assert server.rsets == 1 and server.replies == []
+
+
+def test_pipelined_send_data_accepted_after_refused_recipient():
+    # Some servers answer DATA with 354 even though RCPT failed; the empty message must be ended first
+    server = PipeliningSMTP([(250, b"OK"), (550, b"mailbox unavailable"), (354, b"go ahead"), (554, b"no recipients")])
+    agent = EmailSchedulerAgent()
+    
+    success, message = agent._pipelined_send(server, "from@example.com", "to@example.com", b"body")
+    
+    assert not success
+    assert message == "Failed to send email: 550 mailbox unavailable"
+    assert server.writes[1:] == [b".\r\n"]
+    assert server.rsets == 1 and server.replies == []
+
+
+def test_batch_reuses_pipelined_connection_after_refusal():
+    accepted = [(250, b"OK"), (250, b"OK"), (354, b"go ahead"), (250, b"queued")]
+    server = PipeliningSMTP([(250, b"OK"), (550, b"mailbox unavailable"), (503, b"no valid recipients")] + accepted * 5)
+    connections = []
+    agent = _agent(connections)
+    
+    def connect():
+        connections.append(server)
+        return server
+    agent._connect_smtp = connect
+    
+    emails = ["gone@example.com"] + [f"ok{i}@example.com" for i in range(5)]
+    results = agent.send_batch_interview_invitations(JOB, _candidates(emails))
+    
+    assert [result.success for result in results] == [False] + [True] * 5
+    assert len(connections) == 1 and server.replies == []
+
+
+def test_batch_subject_renders_every_shared_placeholder():
+    connections = []
+    agent = _agent(connections)
+    agent.set_custom_template("interview_invitation", "{job_title} at {company}: {interview_slots}", "Hi {candidate_name}")
+    
+    # One slot keeps the slots text (and so the subject) on a single line
+    agent.send_batch_interview_invitations(JOB, _candidates(["a@example.com", "b@example.com"]), num_slots=1)
+    
+    sent = connections[0].sent_messages
+    assert len(sent) == 2
+    subject = f"Subject: Dev at ACME: {agent._interview_slots_text(1)}".encode()
+    assert all(subject in msg for msg in sent)
+    assert not any(b"{interview_slots}" in msg for msg in sent)
+
+
+def test_batch_with_multiline_subject_fails_per_candidate():
+    connections = []
+    agent = _agent(connections)
+    agent.set_custom_template("interview_invitation", "Slots: {interview_slots}", "Hi {candidate_name}")
+    
+    results = agent.send_batch_interview_invitations(JOB, _candidates(["a@example.com"]), num_slots=3)
+    
+    assert not results[0].success and "linefeed" in results[0].message
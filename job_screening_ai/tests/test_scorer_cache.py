@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from database import DenseScorerCache, ScorerCache
+
+
+SCORE = {"overall_match_score": 72.5, "match_details": {"evaluation": "llm"}}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ScorerCache(str(tmp_path / "cache.db"))
+    yield cache
+    cache.close()
+
+
+def test_hit_for_unchanged_hashes(cache):
+    cache.put_many("JD-1", "jh", [("C-1", "rh1", SCORE), ("C-2", "rh2", SCORE)])
+    assert cache.get_many("JD-1", "jh", {"C-1": "rh1", "C-2": "rh2"}) == {"C-1": SCORE, "C-2": SCORE}
+
+
+def test_changed_resume_hash_is_a_miss(cache):
+    cache.put_many("JD-1", "jh", [("C-1", "rh1", SCORE), ("C-2", "rh2", SCORE)])
+    assert cache.get_many("JD-1", "jh", {"C-1": "rh1-new", "C-2": "rh2"}) == {"C-2": SCORE}
+
+
+def test_changed_job_hash_is_a_miss(cache):
+    cache.put_many("JD-1", "jh", [("C-1", "rh1", SCORE)])
+    assert cache.get_many("JD-1", "jh-new", {"C-1": "rh1"}) == {}
+    assert cache.get_many("JD-2", "jh", {"C-1": "rh1"}) == {}
+
+
+def test_new_score_replaces_stale_entry(cache):
+    cache.put_many("JD-1", "jh", [("C-1", "rh1", SCORE)])
+    updated = {"overall_match_score": 10.0, "match_details": {}}
+    cache.put_many("JD-1", "jh", [("C-1", "rh1-new", updated)])
+    assert cache.get_many("JD-1", "jh", {"C-1": "rh1-new"}) == {"C-1": updated}
+    assert cache.get_many("JD-1", "jh", {"C-1": "rh1"}) == {}
+
+
+def test_entries_persist_across_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = ScorerCache(path)
+    first.put_many("JD-1", "jh", [("C-1", "rh1", SCORE)])
+    first.close()
+    # A fresh instance has an empty memory layer, so this reads from SQLite
+    second = ScorerCache(path)
+    assert second.get_many("JD-1", "jh", {"C-1": "rh1", "C-2": "rh2"}) == {"C-1": SCORE}
+    assert second.get_many("JD-1", "jh", {"C-1": "rh1-new"}) == {}
+    second.close()
+
+
+def test_fingerprint_tracks_content():
+    assert ScorerCache.fingerprint("abc") == ScorerCache.fingerprint("abc")
+    assert ScorerCache.fingerprint("abc") != ScorerCache.fingerprint("abd")
+
+
+@pytest.fixture
+def dense(tmp_path):
+    pytest.importorskip("h5py")
+    cache = DenseScorerCache(str(tmp_path / "scores.h5"))
+    yield cache
+    cache.close()
+
+
+def test_dense_hit_and_miss(dense):
+    dense.put_many("JD-1", "jh", [("C-1", "rh1", 80.0), ("C-2", "rh2", 40.5)])
+    assert dense.get_many("JD-1", "jh", {"C-1": "rh1", "C-2": "rh2", "C-3": "rh3"}) == {"C-1": 80.0, "C-2": 40.5}
+    assert dense.get_many("JD-1", "jh-new", {"C-1": "rh1"}) == {}
+    assert dense.get_many("JD-1", "jh", {"C-1": "rh1-new"}) == {}
+
+
+def test_dense_changed_resume_clears_its_column(dense):
+    dense.put_many("JD-1", "jh", [("C-1", "rh1", 80.0)])
+    dense.put_many("JD-2", "jh2", [("C-1", "rh1", 60.0)])
+    # Re-scoring C-1 against a new resume for JD-2 invalidates its old JD-1 score too
+    dense.put_many("JD-2", "jh2", [("C-1", "rh1-new", 65.0)])
+    assert dense.get_many("JD-1", "jh", {"C-1": "rh1-new"}) == {}
+    assert dense.get_many("JD-2", "jh2", {"C-1": "rh1-new"}) == {"C-1": 65.0}
+
+
+def test_dense_matrix_persists(tmp_path):
+    pytest.importorskip("h5py")
+    path = str(tmp_path / "scores.h5")
+    first = DenseScorerCache(path)
+    first.put_many("JD-1", "jh", [("C-1", "rh1", 80.0)])
+    first.put_many("JD-2", "jh2", [("C-2", "rh2", 30.0)])
+    first.close()
+    second = DenseScorerCache(path)
+    job_ids, candidate_ids, scores = second.matrix()
+    assert job_ids == ["JD-1", "JD-2"] and candidate_ids == ["C-1", "C-2"]
+    assert scores.dtype == np.float32
+    np.testing.assert_array_equal(np.isnan(scores), [[False, True], [True, False]])
+    assert second.get_many("JD-2", "jh2", {"C-2": "rh2"}) == {"C-2": 30.0}
+    second.close()
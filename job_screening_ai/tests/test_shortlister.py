@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from agents.matcher import MatchResult, MatchResultBatch
+from agents.shortlister import ShortlisterAgent
+
+
+def _results(scores):
+    return [
+        MatchResult(job_id="JD-1", candidate_id=f"C-{i}", overall_match_score=score,
+                    skill_match_score=score, experience_match_score=score, education_match_score=score)
+        for i, score in enumerate(scores)
+    ]
+
+
+def _baseline(results, threshold, top_k=None):
+    """Reference selection: passing candidates in input order, or ranked by a full (stable) sort with top_k"""
+    passing = [r for r in results if r.overall_match_score >= threshold]
+    if top_k is not None:
+        passing = sorted(passing, key=lambda r: r.overall_match_score, reverse=True)[:max(top_k, 0)]
+    return [r.candidate_id for r in passing]
+
+
+@pytest.mark.parametrize("top_k", [0, 1, 5, 37, 200])
+@pytest.mark.parametrize("threshold", [0.0, 50.0, 90.0])
+def test_top_k_matches_full_sort(threshold, top_k):
+    rng = np.random.default_rng(7)
+    # Distinct scores so the expected order is unambiguous
+    scores = rng.permutation(np.linspace(0, 100, 150))
+    results = _results(scores.tolist())
+    
+    shortlist = ShortlisterAgent().shortlist_candidates(results, threshold=threshold, top_k=top_k)
+    
+    expected = _baseline(results, threshold, top_k)
+    assert shortlist.shortlisted_candidates == expected
+    assert sorted(shortlist.rejected_candidates) == sorted(set(r.candidate_id for r in results) - set(expected))
+    assert shortlist.shortlist_stats["shortlisted_count"] == len(expected)
+
+
+def test_without_top_k_keeps_input_order():
+    results = _results([60.0, 95.0, 10.0, 80.0])
+    shortlist = ShortlisterAgent().shortlist_candidates(results, threshold=50.0)
+    assert shortlist.shortlisted_candidates == ["C-0", "C-1", "C-3"]
+    assert shortlist.rejected_candidates == ["C-2"]
+
+
+def test_top_k_larger_than_passing_count_is_still_ranked():
+    results = _results([60.0, 95.0, 10.0, 80.0, 95.0])
+    shortlist = ShortlisterAgent().shortlist_candidates(results, threshold=50.0, top_k=10)
+    # Nobody is cut, but the list is ranked; the tie keeps input order
+    assert shortlist.shortlisted_candidates == ["C-1", "C-4", "C-3", "C-0"]
+    assert shortlist.rejected_candidates == ["C-2"]
+    
+    everyone = ShortlisterAgent().shortlist_candidates(results, threshold=0.0, top_k=10)
+    assert everyone.shortlisted_candidates == ["C-1", "C-4", "C-3", "C-0", "C-2"]
+
+
+def test_top_k_ties_at_the_cut_keep_input_order():
+    results = _results([80.0, 90.0, 80.0, 80.0, 20.0])
+    shortlist = ShortlisterAgent().shortlist_candidates(results, threshold=50.0, top_k=3)
+    assert shortlist.shortlisted_candidates[0] == "C-1"
+    assert sorted(shortlist.shortlisted_candidates[1:]) == shortlist.shortlisted_candidates[1:]
+
+
+def test_batch_and_list_inputs_agree():
+    results = _results([72.5, 40.0, 88.0, 70.0, 99.0])
+    agent = ShortlisterAgent()
+    from_list = agent.shortlist_candidates(results, threshold=70.0, top_k=2)
+    from_batch = agent.shortlist_candidates(MatchResultBatch.from_match_results(results), threshold=70.0, top_k=2)
+    assert from_list == from_batch
+    assert from_list.shortlisted_candidates == ["C-4", "C-2"]
+
+
+def test_stats_with_tied_scores():
+    results = _results([80.0, 80.0, 80.0, 20.0])
+    shortlist = ShortlisterAgent().shortlist_candidates(results, threshold=50.0, top_k=2)
+    stats = shortlist.shortlist_stats
+    assert len(shortlist.shortlisted_candidates) == 2
+    assert stats["shortlisted_count"] == 2 and stats["rejected_count"] == 2
+    assert stats["avg_shortlisted_score"] == pytest.approx(80.0)
+    assert stats["avg_rejected_score"] == pytest.approx(50.0)
+
+
+def test_empty_input():
+    shortlist = ShortlisterAgent().shortlist_candidates([], top_k=3)
+    assert shortlist.shortlisted_candidates == [] and shortlist.shortlist_stats["total_candidates"] == 0